@@ -1,16 +1,21 @@
+import asyncio
 import csv
+import hashlib
 import io
 import json
+import os
 import re
+import shutil
 import sys
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import logging
 import streamlit as st
-from anthropic import Anthropic
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,82 +26,166 @@ from pm_copilot.persistence import (
     slugify_project_name, save_project, load_project, ensure_workspace_exists,
     save_project_state, load_project_state,
 )
-from pm_copilot.rag import ForgeRAG, _create_chroma_client, _create_voyage_client
-from pm_copilot.chunking import convert_to_markdown, FileConversionError
 
 logger = logging.getLogger("forge.app")
 from pm_copilot.orchestrator import run_turn
 
-_anthropic_client = Anthropic()
-
 
 @st.cache_resource
 def get_chroma_client(vectordb_path: str):
     """Cached ChromaDB client singleton — avoids SQLite thread-lock errors."""
+    from pm_copilot.rag import _create_chroma_client
     return _create_chroma_client(vectordb_path)
 
 
 @st.cache_resource
 def get_voyage_client(api_key: str):
     """Cached Voyage AI client singleton."""
+    from pm_copilot.rag import _create_voyage_client
     return _create_voyage_client(api_key)
 
 
+def _flush_queued_turns() -> None:
+    """Index the outgoing project's queued turns before its session state is dropped."""
+    rag = st.session_state.get("rag")
+    if rag is None:
+        return
+    try:
+        rag.flush_turns()
+    except Exception as e:
+        logger.warning("Flushing queued turns failed: %s", e)
+
+
+def _init_rag(project_dir: Path):
+    """Create a ForgeRAG for the project on the cached singleton clients.
+
+    ForgeRAG (and with it ChromaDB + Voyage) is imported on first use so
+    sessions that never touch files don't pay the import cost.
+    """
+    from pm_copilot.rag import ForgeRAG
+
+    chroma = get_chroma_client(str(project_dir / "vectordb"))
+    voyage = get_voyage_client(config.VOYAGE_API_KEY) if config.VOYAGE_API_KEY else None
+    rag = ForgeRAG(project_dir, chroma_client=chroma, voyage_client=voyage)
+    threading.Thread(target=rag.warm_up, name="forge-chroma-warmup", daemon=True).start()
+    return rag
+
+
+# ---------------------------------------------------------------------------
+# Project listing
+# ---------------------------------------------------------------------------
+
+@st.cache_data(ttl=5)
+def _list_projects(workspace_str: str) -> list[str]:
+    """Project names, most recently saved first. Cached briefly across reruns."""
+    projects = []
+    with os.scandir(workspace_str) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            # One stat per project: existence check and sort key together
+            try:
+                mtime = os.stat(os.path.join(entry.path, "state.json")).st_mtime
+            except FileNotFoundError:
+                continue
+            projects.append((entry.name, mtime))
+    projects.sort(key=lambda p: p[1], reverse=True)
+    return [name for name, _ in projects]
+
+
 # ---------------------------------------------------------------------------
 # File management helpers
 # ---------------------------------------------------------------------------
 
-def _process_uploaded_file(uploaded_file) -> None:
-    """Save uploaded file, ingest into RAG, update project state.
+def _process_uploaded_files(uploaded_files) -> None:
+    """Save uploaded files, ingest into RAG, update project state.
 
-    File is saved to uploads/ FIRST, before any conversion. If MarkItDown
+    Files are saved to uploads/ FIRST, before any conversion. If MarkItDown
     fails on a corrupted DOCX, the user's file is preserved but ingestion
-    is skipped.
+    is skipped. Summaries for all converted files are generated together.
     """
+    from pm_copilot.chunking import convert_to_markdown, FileConversionError
+
     project_dir = st.session_state.project_dir
     uploads_dir = project_dir / "uploads"
     uploads_dir.mkdir(exist_ok=True)
 
-    # Save file to disk FIRST (before any conversion that might fail)
-    file_path = uploads_dir / uploaded_file.name
-    file_path.write_bytes(uploaded_file.read())
+    # Phase 1: save each file to disk FIRST (before any conversion that might fail)
+    saved_paths = []
+    for uploaded_file in uploaded_files:
+        file_path = uploads_dir / uploaded_file.name
+        with file_path.open("wb") as fp:
+            shutil.copyfileobj(uploaded_file, fp, length=1024 * 1024)
+        saved_paths.append(file_path)
+
+    # Convert to markdown in parallel — files are independent
+    def _safe_convert(file_path: Path) -> tuple[str | None, FileConversionError | None]:
+        try:
+            return convert_to_markdown(file_path), None
+        except FileConversionError as e:
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=min(8, len(saved_paths))) as executor:
+        results = list(executor.map(_safe_convert, saved_paths))
+
+    converted = []
+    for file_path, (md_text, error) in zip(saved_paths, results):
+        if error is not None:
+            logger.warning("Failed to parse %s: %s", file_path.name, error)
+            st.error(
+                f"'{file_path.name}' could not be parsed. "
+                f"The file has been saved but won't be searchable. "
+                f"Try re-exporting from Word as a clean .docx."
+            )
+            continue
+        converted.append((file_path.name, file_path, md_text))
 
-    # Attempt markdown conversion
-    try:
-        md_text = convert_to_markdown(file_path)
-    except FileConversionError as e:
-        logger.warning("Failed to parse %s: %s", uploaded_file.name, e)
-        st.error(
-            f"'{uploaded_file.name}' could not be parsed. "
-            f"The file has been saved but won't be searchable. "
-            f"Try re-exporting from Word as a clean .docx."
-        )
+    if not converted:
         return
 
-    # Generate file summary via LLM
-    summary = _generate_file_summary(uploaded_file.name, md_text[:3000])
+    # Phase 2: generate summaries concurrently, skipping content summarized before
+    summaries = {}
+    cache_paths = {}
+    for filename, file_path, _ in converted:
+        cache_path = _summary_cache_path(project_dir, file_path)
+        if cache_path.exists():
+            summaries[filename] = cache_path.read_text(encoding="utf-8")
+        else:
+            cache_paths[filename] = cache_path
+    if cache_paths:
+        generated, failed = _generate_file_summaries(
+            [(filename, md_text[:3000]) for filename, _, md_text in converted
+             if filename in cache_paths]
+        )
+        for filename, summary in generated.items():
+            if filename in failed:
+                continue  # fallback text; retry on the next upload of this content
+            cache_paths[filename].parent.mkdir(exist_ok=True)
+            cache_paths[filename].write_text(summary, encoding="utf-8")
+        summaries.update(generated)
 
     # Initialize RAG if needed (uses cached singleton clients)
     if st.session_state.rag is None:
-        chroma = get_chroma_client(str(project_dir / "vectordb"))
-        voyage = get_voyage_client(config.VOYAGE_API_KEY) if config.VOYAGE_API_KEY else None
-        st.session_state.rag = ForgeRAG(
-            project_dir, chroma_client=chroma, voyage_client=voyage,
-        )
+        st.session_state.rag = _init_rag(project_dir)
 
-    # Ingest into ChromaDB
-    chunk_count = st.session_state.rag.ingest_file(file_path, summary)
+    # Ingest all files into ChromaDB in one bulk pass
+    chunk_counts = st.session_state.rag.ingest_files_bulk(
+        [(file_path, summaries[filename]) for filename, file_path, _ in converted],
+        markdown={filename: md_text for filename, _, md_text in converted},
+    )
 
-    # Update project state
-    st.session_state.project_state["file_summaries"].append({
-        "filename": uploaded_file.name,
-        "uploaded_at": datetime.now().isoformat(),
-        "summary": summary,
-        "chunk_count": chunk_count,
-    })
+    # Update project state — one timestamp for the whole upload batch
+    uploaded_at = datetime.now(timezone.utc).isoformat()
+    for filename, _, _ in converted:
+        st.session_state.project_state["file_summaries"].append({
+            "filename": filename,
+            "uploaded_at": uploaded_at,
+            "summary": summaries[filename],
+            "chunk_count": chunk_counts[filename],
+        })
+        logger.info("Ingested %s: %d chunks", filename, chunk_counts[filename])
 
     save_project_state(project_dir, st.session_state.project_state)
-    logger.info("Ingested %s: %d chunks", uploaded_file.name, chunk_count)
 
 
 def _delete_file(filename: str) -> None:
@@ -117,64 +206,173 @@ def _delete_file(filename: str) -> None:
     logger.info("Deleted %s from project", filename)
 
 
-def _generate_file_summary(filename: str, content_preview: str) -> str:
-    """Generate 1-paragraph summary of an uploaded file via Haiku."""
-    response = _anthropic_client.messages.create(
-        model=config.TURN_SUMMARY_MODEL,
-        max_tokens=200,
-        messages=[{
-            "role": "user",
-            "content": (
-                "Summarize this document in one paragraph (2-3 sentences). "
-                "Focus on what topics it covers and what kind of information it contains.\n\n"
-                f"Filename: {filename}\n\n"
-                f"Content:\n{content_preview}"
-            ),
-        }],
+def _render_file_row(i: int, file_info: dict) -> None:
+    """Sidebar row for one uploaded file: name, summary preview, delete button."""
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.caption(f"{file_info['filename']}")
+        summary = file_info["summary"]
+        st.caption(summary[:100] + ("..." if len(summary) > 100 else ""))
+    with col2:
+        if st.button("X", key=f"delete_file_{i}"):
+            _delete_file(file_info["filename"])
+            st.rerun()
+
+
+def _summary_cache_path(project_dir: Path, file_path: Path) -> Path:
+    """Location of the cached summary for a file, keyed by content hash."""
+    with file_path.open("rb") as fp:
+        digest = hashlib.file_digest(fp, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    return project_dir / ".summary_cache" / f"{digest}.txt"
+
+
+def _file_summary_prompt(filename: str, content_preview: str) -> str:
+    return (
+        "Summarize this document in one paragraph (2-3 sentences). "
+        "Focus on what topics it covers and what kind of information it contains.\n\n"
+        f"Filename: {filename}\n\n"
+        f"Content:\n{content_preview}"
     )
-    return response.content[0].text
 
 
-def extract_questions(text):
-    """Extract numbered questions from assistant response."""
-    pattern = r"\*{0,2}Question\s+(\d+)\*{0,2}[:\s]*\*{0,2}([^\n*]+)"
-    matches = re.findall(pattern, text)
-    return [(num, title.strip()) for num, title in matches]
+def _generate_file_summaries(previews: list[tuple[str, str]]) -> tuple[dict[str, str], set[str]]:
+    """Generate 1-paragraph summaries for several files via Haiku.
 
+    Requests are issued concurrently, so N uploads cost roughly one
+    round-trip instead of N. Returns ({filename: summary}, failed filenames);
+    a failed request gets a fallback summary instead of aborting the batch.
+    """
+    from anthropic import AsyncAnthropic
+
+    async def _summarize(client: AsyncAnthropic, filename: str, content_preview: str) -> str:
+        response = await client.messages.create(
+            model=config.TURN_SUMMARY_MODEL,
+            max_tokens=200,
+            messages=[{
+                "role": "user",
+                "content": _file_summary_prompt(filename, content_preview),
+            }],
+        )
+        return response.content[0].text
+
+    async def _gather() -> list[str]:
+        # Async client is created per call — its connection pool is bound to this event loop
+        async with AsyncAnthropic() as client:
+            return await asyncio.gather(*(
+                _summarize(client, filename, preview) for filename, preview in previews
+            ), return_exceptions=True)
+
+    summaries = {}
+    failed = set()
+    for (filename, preview), result in zip(previews, asyncio.run(_gather())):
+        if isinstance(result, BaseException):
+            logger.warning("Summary generation failed for %s: %s", filename, result)
+            summaries[filename] = f"{filename}: {preview[:200].strip()}"
+            failed.add(filename)
+        else:
+            summaries[filename] = result
+    return summaries, failed
+
+
+@st.cache_data
+def _assumptions_to_pretty_json(register_json: str) -> str:
+    """Indented JSON export of the assumption register. Cached on the register's JSON."""
+    return json.dumps(json.loads(register_json), indent=2)
+
+
+@st.cache_data
+def _assumptions_to_csv(register_json: str) -> str:
+    """Serialize the assumption register to CSV. Cached on the register's JSON."""
+    assumptions = json.loads(register_json)
+    csv_buffer = io.StringIO()
+    if assumptions:
+        first = next(iter(assumptions.values()))
+        fieldnames = list(first.keys())
+        list_fields = [k for k, v in first.items() if isinstance(v, list)]
+        writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
+        writer.writeheader()
+        for aid, a in sorted(assumptions.items()):
+            row = dict(a)
+            for k in list_fields:
+                if isinstance(row.get(k), list):
+                    row[k] = "; ".join(str(i) for i in row[k])
+            writer.writerow(row)
+    return csv_buffer.getvalue()
+
+
+_STATUS_ICONS = {"active": "🟢", "at_risk": "🟡", "validated": "✅", "invalidated": "❌"}
+_CONFIDENCE_ICONS = {"guessed": "❓", "informed": "💡", "validated": "✅"}
+
+_MODES_ROADMAP = "  \n".join([
+    "✅ Mode 1: Discover & Frame",
+    "✅ Mode 2: Evaluate Solution",
+    "Mode 3: Surface Constraints",
+    "Mode 4: Size & Value",
+    "Mode 5: Prioritize & Sequence",
+])
+
+
+def _assumption_list_markdown(assumptions: dict) -> str:
+    """One markdown block for the sidebar assumption list."""
+    entries = []
+    for _, a in sorted(assumptions.items()):
+        status_icon = _STATUS_ICONS.get(a["status"], "⚪")
+        confidence_icon = _CONFIDENCE_ICONS.get(a["confidence"], "⚪")
+        entry = (
+            f"**{a['id']}** {status_icon} {a['claim']}\n\n"
+            f":gray[Impact: {a['impact']} | Confidence: {confidence_icon} {a['confidence']}"
+            f" | Action: {a.get('recommended_action', 'None')}]"
+        )
+        if a.get("depends_on"):
+            entry += f"  \n:gray[Depends on: {', '.join(a['depends_on'])}]"
+        entries.append(entry)
+    return "\n\n---\n\n".join(entries)
 
-st.set_page_config(page_title="Forge", layout="wide")
 
 # Prevent sidebar expander labels from truncating
-st.markdown(
-    """
-    <style>
-    [data-testid="stSidebar"] [data-testid="stExpander"] summary p {
-        white-space: normal;
-        overflow: visible;
-        text-overflow: unset;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+_SIDEBAR_CSS = """
+<style>
+[data-testid="stSidebar"] [data-testid="stExpander"] summary p {
+    white-space: normal;
+    overflow: visible;
+    text-overflow: unset;
+}
+</style>
+"""
 
-# --- Initialize ---
-init_session_state()
-logger.info("App startup — session initialized")
+# Most recent uploads listed inline in the sidebar
+_VISIBLE_FILES = 10
+
+# Most recent messages rendered as individual chat bubbles
+_CHAT_TAIL_MESSAGES = 10
+
+# artifact_type -> (download label, file name)
+_ARTIFACT_DOWNLOADS = {
+    "problem_brief": ("Download Problem Brief", "problem_brief.md"),
+    "solution_evaluation_brief": ("Download Solution Evaluation", "solution_evaluation.md"),
+}
+
+_QUESTION_RE = re.compile(r"\*{0,2}Question\s+(\d+)\*{0,2}[:\s]*\*{0,2}([^\n*]+)")
+
+
+def extract_questions(text):
+    """Extract numbered questions from assistant response."""
+    matches = _QUESTION_RE.findall(text)
+    return [(num, title.strip()) for num, title in matches]
 
-# --- Sidebar ---
-with st.sidebar:
-    st.title("Forge")
 
+# ---------------------------------------------------------------------------
+# Sidebar fragments — interactions inside rerun only the fragment
+# ---------------------------------------------------------------------------
+
+@st.fragment
+def _render_project_list() -> None:
+    """Project picker and creation. Typing a name reruns only this fragment."""
     # --- Project Management ---
     workspace_dir = ensure_workspace_exists()
 
     # List existing projects
-    existing_projects = sorted(
-        [d.name for d in workspace_dir.iterdir() if d.is_dir() and (d / "state.json").exists()],
-        key=lambda x: (workspace_dir / x / "state.json").stat().st_mtime,
-        reverse=True,
-    )
+    existing_projects = _list_projects(str(workspace_dir))
 
     project_options = ["— Select a project —"] + existing_projects
 
@@ -194,13 +392,14 @@ with st.sidebar:
                 else:
                     project_dir.mkdir(parents=True)
                     (project_dir / "artifacts").mkdir()
-                    for key in list(st.session_state.keys()):
-                        del st.session_state[key]
+                    _flush_queued_turns()
+                    st.session_state.clear()
                     init_session_state()
                     st.session_state.project_name = new_name.strip()
                     st.session_state.project_dir = project_dir
                     st.session_state.is_priming_turn = True
                     save_project(project_dir)
+                    _list_projects.clear()
                     st.session_state.project_selector = slug
                     st.rerun()
 
@@ -209,22 +408,79 @@ with st.sidebar:
         project_dir = workspace_dir / selected
         current_dir = getattr(st.session_state, 'project_dir', None)
         if current_dir != project_dir:
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            _flush_queued_turns()
+            st.session_state.clear()
             load_project(project_dir)
             st.session_state.project_state = load_project_state(project_dir)
             # Reconnect RAG to existing ChromaDB data
             try:
-                chroma = get_chroma_client(str(project_dir / "vectordb"))
-                voyage = get_voyage_client(config.VOYAGE_API_KEY) if config.VOYAGE_API_KEY else None
-                st.session_state.rag = ForgeRAG(
-                    project_dir, chroma_client=chroma, voyage_client=voyage,
-                )
+                st.session_state.rag = _init_rag(project_dir)
             except Exception as e:
                 logger.warning("RAG init on project load failed: %s", e)
             st.session_state.project_selector = selected
             st.rerun()
 
+
+@st.fragment
+def _render_downloads() -> None:
+    """Artifact and assumption-register downloads. Clicks rerun only this fragment."""
+    # Artifact download
+    if st.session_state.latest_artifact:
+        st.divider()
+        st.subheader("Latest Artifact")
+        label, filename = _ARTIFACT_DOWNLOADS.get(
+            st.session_state.latest_artifact_kind, _ARTIFACT_DOWNLOADS["problem_brief"]
+        )
+        st.download_button(
+            label=label,
+            data=st.session_state.latest_artifact,
+            file_name=filename,
+            mime="text/markdown",
+            use_container_width=True,
+        )
+
+    # Assumption register download
+    if st.session_state.assumption_register:
+        st.divider()
+        st.subheader("Assumption Register")
+
+        # Compact serialization doubles as the cache key for both exports
+        register_json = json.dumps(st.session_state.assumption_register)
+
+        # JSON download
+        st.download_button(
+            "Download as JSON",
+            data=_assumptions_to_pretty_json(register_json),
+            file_name="assumption_register.json",
+            mime="application/json",
+            use_container_width=True,
+        )
+
+        # CSV download
+        st.download_button(
+            "Download as CSV",
+            data=_assumptions_to_csv(register_json),
+            file_name="assumption_register.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
+
+
+st.set_page_config(page_title="Forge", layout="wide")
+
+# Re-emitted every run: Streamlit drops elements a rerun doesn't write
+st.markdown(_SIDEBAR_CSS, unsafe_allow_html=True)
+
+# --- Initialize ---
+init_session_state()
+logger.info("App startup — session initialized")
+
+# --- Sidebar ---
+with st.sidebar:
+    st.title("Forge")
+
+    _render_project_list()
+
     # Show current project info
     if hasattr(st.session_state, 'project_name') and st.session_state.project_name:
         st.caption(f"Current: **{st.session_state.project_name}**")
@@ -241,30 +497,27 @@ with st.sidebar:
             project_state = st.session_state.project_state
             file_summaries = project_state.get("file_summaries", [])
 
-            # List existing files
-            for i, file_info in enumerate(file_summaries):
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.caption(f"{file_info['filename']}")
-                    summary_preview = file_info["summary"][:100]
-                    if len(file_info["summary"]) > 100:
-                        summary_preview += "..."
-                    st.caption(summary_preview)
-                with col2:
-                    if st.button("X", key=f"delete_file_{i}"):
-                        _delete_file(file_info["filename"])
-                        st.rerun()
+            # List existing files — most recent inline, older ones collapsed
+            older_count = max(len(file_summaries) - _VISIBLE_FILES, 0)
+            for i, file_info in enumerate(file_summaries[older_count:], start=older_count):
+                _render_file_row(i, file_info)
+            if older_count:
+                with st.expander(f"{older_count} older files"):
+                    for i, file_info in enumerate(file_summaries[:older_count]):
+                        _render_file_row(i, file_info)
 
             # Upload button
-            uploaded_file = st.file_uploader(
-                "Upload document",
+            uploaded_files = st.file_uploader(
+                "Upload documents",
                 type=["docx", "md"],
                 key="file_uploader",
+                accept_multiple_files=True,
             )
 
-            if uploaded_file:
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    _process_uploaded_file(uploaded_file)
+            if uploaded_files:
+                names = ", ".join(f.name for f in uploaded_files)
+                with st.spinner(f"Processing {names}..."):
+                    _process_uploaded_files(uploaded_files)
                 st.rerun()
 
         st.divider()
@@ -283,11 +536,14 @@ with st.sidebar:
     if st.session_state.assumption_register:
         assumptions = st.session_state.assumption_register
 
-        # Quick summary counts
+        # Quick summary counts (single pass)
         total = len(assumptions)
-        active = sum(1 for a in assumptions.values() if a["status"] == "active")
-        at_risk = sum(1 for a in assumptions.values() if a["status"] == "at_risk")
-        guessed = sum(1 for a in assumptions.values() if a["confidence"] == "guessed")
+        active = at_risk = guessed = 0
+        for a in assumptions.values():
+            status = a["status"]
+            active += status == "active"
+            at_risk += status == "at_risk"
+            guessed += a["confidence"] == "guessed"
 
         st.metric("Assumptions", total)
 
@@ -297,104 +553,43 @@ with st.sidebar:
         col2.metric("At Risk", at_risk)
         col3.metric("Guessed", guessed)
 
-        # Expandable detail view
-        with st.expander("View All Assumptions", expanded=False):
-            for aid, a in sorted(assumptions.items()):
-                status_icon = {"active": "🟢", "at_risk": "🟡", "validated": "✅", "invalidated": "❌"}.get(a["status"], "⚪")
-                confidence_icon = {"guessed": "❓", "informed": "💡", "validated": "✅"}.get(a["confidence"], "⚪")
-
-                st.markdown(f"**{a['id']}** {status_icon} {a['claim']}")
-                st.caption(f"Impact: {a['impact']} | Confidence: {confidence_icon} {a['confidence']} | Action: {a.get('recommended_action', 'None')}")
-                if a.get("depends_on"):
-                    st.caption(f"Depends on: {', '.join(a['depends_on'])}")
-                st.markdown("---")
+        # Expandable detail view — collapsed expanders still run their body,
+        # so render the whole list as one markdown element, not 3-4 per assumption
+        with st.expander(f"View All Assumptions ({total})", expanded=False):
+            st.markdown(_assumption_list_markdown(assumptions))
     else:
         st.caption("No assumptions tracked yet.")
 
     # Document skeleton display
     st.divider()
-    st.subheader("Document Skeleton")
     skeleton = st.session_state.document_skeleton
-    if skeleton["problem_statement"]:
-        with st.expander("**Problem Statement**", expanded=True):
-            st.write(skeleton["problem_statement"])
-    if skeleton["stakeholders"]:
-        st.write(f"**Stakeholders:** {len(skeleton['stakeholders'])} identified")
-    if any(skeleton["success_metrics"].values()):
-        st.write("**Metrics:** Defined")
+    with st.expander("Document Skeleton", expanded=False):
+        if skeleton["problem_statement"]:
+            st.markdown(f"**Problem Statement**\n\n{skeleton['problem_statement']}")
+        if skeleton["stakeholders"]:
+            st.write(f"**Stakeholders:** {len(skeleton['stakeholders'])} identified")
+        if any(skeleton["success_metrics"].values()):
+            st.write("**Metrics:** Defined")
 
-    # Artifact download
-    if st.session_state.latest_artifact:
-        st.divider()
-        st.subheader("Latest Artifact")
-        if st.session_state.latest_artifact.startswith("# Solution Evaluation"):
-            label = "Download Solution Evaluation"
-            filename = "solution_evaluation.md"
-        else:
-            label = "Download Problem Brief"
-            filename = "problem_brief.md"
-        st.download_button(
-            label=label,
-            data=st.session_state.latest_artifact,
-            file_name=filename,
-            mime="text/markdown",
-            use_container_width=True,
-        )
-
-    # Assumption register download
-    if st.session_state.assumption_register:
-        st.divider()
-        st.subheader("Assumption Register")
-
-        assumptions = st.session_state.assumption_register
-
-        # JSON download
-        st.download_button(
-            "Download as JSON",
-            data=json.dumps(assumptions, indent=2),
-            file_name="assumption_register.json",
-            mime="application/json",
-            use_container_width=True,
-        )
-
-        # CSV download
-        csv_buffer = io.StringIO()
-        if assumptions:
-            first = next(iter(assumptions.values()))
-            fieldnames = list(first.keys())
-            writer = csv.DictWriter(csv_buffer, fieldnames=fieldnames)
-            writer.writeheader()
-            for aid, a in sorted(assumptions.items()):
-                row = {}
-                for k, v in a.items():
-                    if isinstance(v, list):
-                        row[k] = "; ".join(str(i) for i in v)
-                    else:
-                        row[k] = v
-                writer.writerow(row)
-
-        st.download_button(
-            "Download as CSV",
-            data=csv_buffer.getvalue(),
-            file_name="assumption_register.csv",
-            mime="text/csv",
-            use_container_width=True,
-        )
+    _render_downloads()
 
     # Modes roadmap
     st.divider()
-    st.subheader("Modes")
-    st.write("✅ Mode 1: Discover & Frame")
-    st.write("✅ Mode 2: Evaluate Solution")
-    st.write("Mode 3: Surface Constraints")
-    st.write("Mode 4: Size & Value")
-    st.write("Mode 5: Prioritize & Sequence")
+    with st.expander("Modes", expanded=False):
+        st.markdown(_MODES_ROADMAP)
 
 # --- Main Chat ---
 st.title("Forge")
 
-# Display chat history
-for msg in st.session_state.messages:
+# Display chat history — older messages collapse into one markdown block
+messages = st.session_state.messages
+older, recent = messages[:-_CHAT_TAIL_MESSAGES], messages[-_CHAT_TAIL_MESSAGES:]
+if older:
+    with st.expander(f"Earlier messages ({len(older)})", expanded=False):
+        st.markdown("\n\n---\n\n".join(
+            f"**{msg['role'].title()}:**\n\n{msg['content']}" for msg in older
+        ))
+for msg in recent:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
 
@@ -442,17 +637,23 @@ if user_input := st.chat_input("Describe your problem, opportunity, or idea...")
         st.markdown(user_input)
 
     with st.chat_message("assistant"):
+        placeholder = st.empty()
+        streamed = []
+
+        def show_delta(text: str):
+            streamed.append(text)
+            placeholder.markdown("".join(streamed))
+
         with st.spinner("Thinking..."):
-            response = run_turn(orchestrator_input)
-        st.markdown(response)
+            response = run_turn(orchestrator_input, on_text=show_delta)
+        # Final text replaces the stream: it adds error notices and drops
+        # partial output from a call that failed mid-stream
+        placeholder.markdown(response)
 
     # If user selectively responded, store clean version for display history
     if orchestrator_input != user_input:
         # run_turn stored orchestrator_input; replace with clean version
-        for msg in reversed(st.session_state.messages):
-            if msg["role"] == "user" and msg["content"] == orchestrator_input:
-                msg["content"] = user_input
-                break
+        st.session_state.messages[st.session_state.last_user_msg_idx]["content"] = user_input
 
     # Detect questions in new response for next turn's checkboxes
     questions = extract_questions(response)
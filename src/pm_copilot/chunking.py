@@ -1,12 +1,28 @@
 """Document chunking — DOCX/MD → Markdown conversion and hierarchical chunking."""
 
+import bisect
+import functools
 import hashlib
+import itertools
 import logging
+import multiprocessing
+import os
 import re
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 logger = logging.getLogger("forge.chunking")
 
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\n+")
+# ASCII \s: split points only need plain whitespace, not the Unicode table
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+", re.ASCII)
+_WORD_SPLIT_RE = re.compile(r"\s+", re.ASCII)
+# Oversized text is split at the first separator, then the next only where needed
+_SEPARATORS = (_PARAGRAPH_SPLIT_RE, _SENTENCE_SPLIT_RE, _WORD_SPLIT_RE)
+
 
 class FileConversionError(Exception):
     """Raised when MarkItDown fails to parse a file.
@@ -16,9 +32,48 @@ class FileConversionError(Exception):
     """
 
 
+_TOKENS_PER_WORD = 1.3
+
+
 def _estimate_tokens(text: str) -> int:
     """Approximate token count. Good enough for chunking decisions."""
-    return int(len(text.split()) * 1.3)
+    return int(len(text.split()) * _TOKENS_PER_WORD)
+
+
+def _chunk_tokens(chunk: dict) -> int:
+    """Token estimate for a chunk, computed once and cached on the chunk."""
+    tokens = chunk.get("token_count")
+    if tokens is None:
+        tokens = chunk["token_count"] = _estimate_tokens(chunk["text"])
+    return tokens
+
+
+def _token_ceiling(chunk: dict) -> int:
+    """Cheap upper bound on a chunk's token estimate, with no word split.
+
+    A text of n characters holds at most (n + 1) // 2 words. Uses the
+    cached estimate instead when one is already on the chunk.
+    """
+    tokens = chunk.get("token_count")
+    if tokens is None:
+        tokens = int((len(chunk["text"]) + 1) // 2 * _TOKENS_PER_WORD)
+    return tokens
+
+
+def _may_exceed(chunk: dict, max_tokens: int) -> bool:
+    """True if the chunk's token estimate is over max_tokens.
+
+    Most chunks are ruled out by _token_ceiling without counting words.
+    """
+    return _token_ceiling(chunk) > max_tokens and _chunk_tokens(chunk) > max_tokens
+
+
+@functools.lru_cache(maxsize=1)
+def _get_converter():
+    """Shared MarkItDown instance — built once, not per converted file."""
+    from markitdown import MarkItDown
+
+    return MarkItDown()
 
 
 def convert_to_markdown(file_path: Path) -> str:
@@ -42,10 +97,7 @@ def convert_to_markdown(file_path: Path) -> str:
     if suffix == ".docx":
         logger.info("Converting DOCX to markdown: %s", file_path.name)
         try:
-            from markitdown import MarkItDown
-
-            converter = MarkItDown()
-            result = converter.convert(str(file_path))
+            result = _get_converter().convert(str(file_path))
             return result.text_content
         except Exception as exc:
             logger.error("MarkItDown failed on %s: %s", file_path.name, exc)
@@ -56,6 +108,21 @@ def convert_to_markdown(file_path: Path) -> str:
     raise FileConversionError(f"Unsupported file type: {suffix}")
 
 
+def _parse_header(line: str) -> tuple[int, str] | None:
+    """Return (level, title) if the line is an H1-H3 header, else None.
+
+    A header is 1-3 '#', a space or tab, then at least one more character.
+    That character may itself be whitespace, so "#  " is a header with an
+    empty title while "# " is not.
+    """
+    if not line.startswith("#"):
+        return None
+    level = len(line) - len(line.lstrip("#"))
+    if level > 3 or line[level:level + 1] not in (" ", "\t") or len(line) < level + 2:
+        return None
+    return level, line[level:].strip()
+
+
 def split_markdown_by_headers(
     markdown_text: str,
     source_filename: str,
@@ -68,72 +135,94 @@ def split_markdown_by_headers(
         level:          Header depth (1=H1, 2=H2, 3=H3, 0=pre-header content)
         context_header: "[Source: filename > Findings > Customer Segments]"
     """
-    header_pattern = re.compile(r"^(#{1,3})\s+(.+)$", re.MULTILINE)
-
-    # Find all header positions
-    matches = list(header_pattern.finditer(markdown_text))
+    chunks = list(_iter_header_chunks(markdown_text, source_filename))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Split %s into %d header-based chunks", source_filename, len(chunks)
+        )
+    return chunks
 
-    if not matches:
-        # No headers at all — return the whole text as one chunk
-        return [
-            {
-                "text": markdown_text.strip(),
-                "header_path": ["Introduction"],
-                "level": 0,
-                "context_header": f"[Source: {source_filename}]",
-            }
-        ]
 
-    chunks = []
+def _iter_header_chunks(markdown_text: str, source_filename: str) -> Iterator[dict]:
+    """Generator behind split_markdown_by_headers."""
+    # Chunk text is cut from markdown_text by (start, end) offsets, with
+    # surrounding whitespace trimmed on the offsets rather than by .strip().
+    # Record (offset, level, title) for each header. Only lines starting with
+    # '#' can be headers, so jump between "\n#" hits instead of visiting every line.
+    headers: list[tuple[int, int, str]] = []
+    search_from = 0
+    offset = 0 if markdown_text.startswith("#") else -1
+    while True:
+        if offset < 0:
+            hit = markdown_text.find("\n#", search_from)
+            if hit < 0:
+                break
+            offset = hit + 1
+        line_end = markdown_text.find("\n", offset)
+        if line_end < 0:
+            line_end = len(markdown_text)
+        parsed = _parse_header(markdown_text[offset:line_end])
+        if parsed:
+            level, title = parsed
+            headers.append((offset, level, sys.intern(title)))
+        search_from = line_end
+        offset = -1
+
+    if not headers:
+        # No headers at all — the whole text is one chunk
+        yield {
+            "text": markdown_text.strip(),
+            "header_path": ["Introduction"],
+            "level": 0,
+            "context_header": f"[Source: {source_filename}]",
+        }
+        return
 
     # Content before the first header
-    pre_header = markdown_text[: matches[0].start()].strip()
+    pre_start, pre_end = _strip_span(markdown_text, 0, headers[0][0])
+    pre_header = markdown_text[pre_start:pre_end]
     if pre_header:
-        chunks.append(
-            {
-                "text": pre_header,
-                "header_path": ["Introduction"],
-                "level": 0,
-                "context_header": f"[Source: {source_filename} > Introduction]",
-            }
-        )
-
-    # Track the current header stack for building header_path
-    # Stack entries: (level, title)
-    header_stack: list[tuple[int, str]] = []
-
-    for i, match in enumerate(matches):
-        hashes = match.group(1)
-        title = match.group(2).strip()
-        level = len(hashes)
-
+        yield {
+            "text": pre_header,
+            "header_path": ["Introduction"],
+            "level": 0,
+            "context_header": f"[Source: {source_filename} > Introduction]",
+        }
+
+    # Current ancestor title at each header level (H1-H3); None where unset.
+    # prefix_by_level[k] caches "[Source: file > ... > title" for that level,
+    # built from the nearest ancestor's prefix instead of re-joining the path.
+    path_by_level: list[str | None] = [None, None, None]
+    prefix_by_level: list[str] = ["", "", ""]
+    source_prefix = f"[Source: {sys.intern(source_filename)}"
+
+    for i, (start, level, title) in enumerate(headers):
         # Determine text extent: from this header to the next header (or end)
-        start = match.start()
-        end = matches[i + 1].start() if i + 1 < len(matches) else len(markdown_text)
-        text = markdown_text[start:end].strip()
+        end = headers[i + 1][0] if i + 1 < len(headers) else len(markdown_text)
+        text_start, text_end = _strip_span(markdown_text, start, end)
+        text = markdown_text[text_start:text_end]
 
-        # Update header stack: pop anything at same level or deeper
-        while header_stack and header_stack[-1][0] >= level:
-            header_stack.pop()
-        header_stack.append((level, title))
+        # Set this level's title and clear anything deeper
+        path_by_level[level - 1] = title
+        for deeper in range(level, 3):
+            path_by_level[deeper] = None
 
-        header_path = [t for _, t in header_stack]
-        path_str = " > ".join(header_path)
-        context_header = f"[Source: {source_filename} > {path_str}]"
+        parent_prefix = source_prefix
+        for ancestor in range(level - 2, -1, -1):
+            if path_by_level[ancestor] is not None:
+                parent_prefix = prefix_by_level[ancestor]
+                break
+        prefix_by_level[level - 1] = f"{parent_prefix} > {title}"
 
-        chunks.append(
-            {
-                "text": text,
-                "header_path": header_path,
-                "level": level,
-                "context_header": context_header,
-            }
-        )
+        header_path = [t for t in path_by_level if t is not None]
+        context_header = prefix_by_level[level - 1] + "]"
 
-    logger.debug(
-        "Split %s into %d header-based chunks", source_filename, len(chunks)
-    )
-    return chunks
+        yield {
+            "text": text,
+            "header_path": header_path,
+            "level": level,
+            "context_header": context_header,
+        }
 
 
 def enforce_chunk_sizes(
@@ -145,95 +234,132 @@ def enforce_chunk_sizes(
 
     - Chunks > max_tokens: split at paragraph boundaries, then sentence boundaries
     - Chunks < min_tokens: merge with the next chunk at the same level
-    - Never split mid-sentence
+    - Only split mid-sentence when a single sentence exceeds max_tokens
     """
-    result: list[dict] = []
+    return list(_iter_sized_chunks(chunks, min_tokens, max_tokens))
+
+
+def _iter_sized_chunks(
+    chunks: Iterable[dict], min_tokens: int, max_tokens: int
+) -> Iterator[dict]:
+    """Generator behind enforce_chunk_sizes — holds at most one chunk back for merging."""
+    pending: dict | None = None
 
     for chunk in chunks:
-        tokens = _estimate_tokens(chunk["text"])
-        if tokens > max_tokens:
-            result.extend(_split_large_chunk(chunk, max_tokens))
-        else:
-            result.append(chunk)
-
-    # Second pass: merge undersized chunks with the next sibling
-    merged: list[dict] = []
-    i = 0
-    while i < len(result):
-        current = result[i]
-        tokens = _estimate_tokens(current["text"])
-
-        # Merge with next chunk if undersized and next chunk exists at same level
-        if tokens < min_tokens and i + 1 < len(result):
-            next_chunk = result[i + 1]
-            if next_chunk["level"] == current["level"]:
-                combined_text = current["text"] + "\n\n" + next_chunk["text"]
-                merged_chunk = {
-                    "text": combined_text,
-                    "header_path": current["header_path"],
-                    "level": current["level"],
-                    "context_header": current["context_header"],
-                }
-                merged.append(merged_chunk)
-                i += 2  # skip the next chunk since we merged it
+        pieces = _split_large_chunk(chunk, max_tokens) if _may_exceed(chunk, max_tokens) else [chunk]
+        for current in pieces:
+            if pending is None:
+                pending = current
                 continue
 
-        merged.append(current)
-        i += 1
+            # Merge undersized pending chunk with this one if at the same level
+            if current["level"] == pending["level"] and _chunk_tokens(pending) < min_tokens:
+                yield {
+                    "text": pending["text"] + "\n\n" + current["text"],
+                    "header_path": pending["header_path"],
+                    "level": pending["level"],
+                    "context_header": pending["context_header"],
+                    "token_count": _chunk_tokens(pending) + _chunk_tokens(current),
+                }
+                pending = None
+            else:
+                yield pending
+                pending = current
 
-    return merged
+    if pending is not None:
+        yield pending
 
 
 def _split_large_chunk(chunk: dict, max_tokens: int) -> list[dict]:
-    """Split an oversized chunk at paragraph boundaries, then sentence boundaries."""
-    text = chunk["text"]
+    """Split an oversized chunk at paragraph, then sentence, then word boundaries.
 
-    # Try splitting at double-newline (paragraph) boundaries
-    paragraphs = re.split(r"\n\n+", text)
-    sub_chunks = _group_segments(paragraphs, max_tokens, separator="\n\n")
-
-    # If any sub-chunk is still too large, split at sentence boundaries
-    final = []
-    for sc_text in sub_chunks:
-        if _estimate_tokens(sc_text) > max_tokens:
-            sentences = re.split(r"(?<=\. )", sc_text)
-            sentence_groups = _group_segments(sentences, max_tokens, separator="")
-            final.extend(sentence_groups)
-        else:
-            final.append(sc_text)
+    Works on (start, end) offsets into the chunk text so each sub-chunk is
+    cut out with a single slice, rather than splitting into paragraph and
+    sentence strings and joining them back together.
+    """
+    text = chunk["text"]
+    final = list(_recursive_split(text, 0, len(text), max_tokens, depth=0))
 
     # Build chunk dicts for each sub-chunk
     result = []
-    for idx, sc_text in enumerate(final):
+    for idx, (start, end, words) in enumerate(final):
         suffix = f" (part {idx + 1})" if len(final) > 1 else ""
+        start, end = _strip_span(text, start, end)
         result.append(
             {
-                "text": sc_text.strip(),
+                "text": text[start:end],
                 "header_path": chunk["header_path"],
                 "level": chunk["level"],
                 "context_header": chunk["context_header"] + suffix,
+                "token_count": int(words * _TOKENS_PER_WORD),
             }
         )
     return result
 
 
-def _group_segments(
-    segments: list[str], max_tokens: int, separator: str
-) -> list[str]:
-    """Group text segments into chunks that don't exceed max_tokens."""
-    groups: list[str] = []
-    current_parts: list[str] = []
+def _recursive_split(
+    text: str, start: int, end: int, max_tokens: int, depth: int
+) -> Iterator[tuple[int, int, int]]:
+    """Split text[start:end] at _SEPARATORS[depth], recursing into groups still over budget.
 
-    for seg in segments:
-        candidate = separator.join(current_parts + [seg]) if current_parts else seg
-        if _estimate_tokens(candidate) > max_tokens and current_parts:
-            groups.append(separator.join(current_parts))
-            current_parts = [seg]
+    Yields (start, end, words) for each final sub-chunk. Groups that already
+    fit are never rescanned with the finer separators.
+    """
+    segments = _segment_spans(text, _SEPARATORS[depth], start, end)
+    for group in _group_spans(text, segments, max_tokens):
+        if int(group[2] * _TOKENS_PER_WORD) > max_tokens and depth + 1 < len(_SEPARATORS):
+            yield from _recursive_split(text, group[0], group[1], max_tokens, depth + 1)
         else:
-            current_parts.append(seg)
+            yield group
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """Narrow (start, end) past surrounding whitespace, like text[start:end].strip()."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
 
-    if current_parts:
-        groups.append(separator.join(current_parts))
+def _segment_spans(
+    text: str, separator: re.Pattern, start: int, end: int
+) -> list[tuple[int, int]]:
+    """(start, end) offsets of the pieces separator.split(text[start:end]) would return."""
+    spans: list[tuple[int, int]] = []
+    for match in separator.finditer(text, start, end):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, end))
+    return spans
+
+
+def _group_spans(
+    text: str, spans: list[tuple[int, int]], max_tokens: int
+) -> list[tuple[int, int, int]]:
+    """Group adjacent segment spans into (start, end, words) runs within max_tokens.
+
+    Tracks a running word count, so every segment is counted once and
+    each group stays a single contiguous range of text.
+    """
+    groups: list[tuple[int, int, int]] = []
+    group_start = group_end = -1
+    group_words = 0
+
+    for start, end in spans:
+        seg_words = len(text[start:end].split())
+        if int((group_words + seg_words) * _TOKENS_PER_WORD) > max_tokens and group_start >= 0:
+            groups.append((group_start, group_end, group_words))
+            group_start = start
+            group_words = seg_words
+        else:
+            if group_start < 0:
+                group_start = start
+            group_words += seg_words
+        group_end = end
+
+    if group_start >= 0:
+        groups.append((group_start, group_end, group_words))
 
     return groups
 
@@ -250,81 +376,79 @@ def create_parent_child_pairs(
         parent_id:    Hash of parent text (for deduplication in retrieval)
         leaf_index:   Position of this leaf within its parent
     """
-    if not chunks:
-        return []
-
-    # Group chunks by their top-level header (first element of header_path)
-    groups: list[list[dict]] = []
-    current_group: list[dict] = [chunks[0]]
-    current_top = chunks[0]["header_path"][0] if chunks[0]["header_path"] else ""
-
-    for chunk in chunks[1:]:
-        top = chunk["header_path"][0] if chunk["header_path"] else ""
-        if top == current_top:
-            current_group.append(chunk)
-        else:
-            groups.append(current_group)
-            current_group = [chunk]
-            current_top = top
-    groups.append(current_group)
+    return list(_iter_parent_child_pairs(chunks, parent_max_tokens))
 
-    # Build parent-child pairs
-    result = []
-    for group in groups:
-        parent_text = "\n\n".join(c["text"] for c in group)
-        parent_tokens = _estimate_tokens(parent_text)
-
-        if parent_tokens <= parent_max_tokens:
-            # Single parent for the whole group
-            parent_id = hashlib.md5(parent_text.encode()).hexdigest()[:12]
-            for idx, chunk in enumerate(group):
-                result.append(
-                    {
-                        **chunk,
-                        "parent_text": parent_text,
-                        "parent_id": parent_id,
-                        "leaf_index": idx,
-                    }
-                )
-        else:
-            # Parent too large — split into sub-parents at natural boundaries
-            sub_parents = _split_parent_group(group, parent_max_tokens)
-            for sub_group in sub_parents:
-                sub_text = "\n\n".join(c["text"] for c in sub_group)
-                sub_id = hashlib.md5(sub_text.encode()).hexdigest()[:12]
-                for idx, chunk in enumerate(sub_group):
-                    result.append(
-                        {
-                            **chunk,
-                            "parent_text": sub_text,
-                            "parent_id": sub_id,
-                            "leaf_index": idx,
-                        }
-                    )
 
-    return result
+def _iter_parent_child_pairs(
+    chunks: Iterable[dict], parent_max_tokens: int
+) -> Iterator[dict]:
+    """Generator behind create_parent_child_pairs — buffers one top-level group at a time."""
+    # Group consecutive chunks by their top-level header (first element of header_path)
+    for _, group in itertools.groupby(chunks, key=_top_header):
+        yield from _pair_group(list(group), parent_max_tokens)
+
+
+def _top_header(chunk: dict) -> str:
+    """Top-level header of a chunk, or "" for chunks with no header path."""
+    header_path = chunk["header_path"]
+    return header_path[0] if header_path else ""
+
+
+def _pair_group(group: list[dict], parent_max_tokens: int) -> Iterator[dict]:
+    """Attach parent text/id to every leaf of one top-level group."""
+    if (
+        sum(_token_ceiling(c) for c in group) <= parent_max_tokens
+        or sum(_chunk_tokens(c) for c in group) <= parent_max_tokens
+    ):
+        # Single parent for the whole group
+        sub_parents = [group]
+    else:
+        # Parent too large — split into sub-parents at natural boundaries
+        sub_parents = _split_parent_group(group, parent_max_tokens)
+
+    for sub_group in sub_parents:
+        parent_text = "\n\n".join(c["text"] for c in sub_group)
+        parent_id = _parent_id(sub_group)
+        for idx, chunk in enumerate(sub_group):
+            # Augment the leaf in place rather than copying it into a new dict
+            chunk["parent_text"] = parent_text
+            chunk["parent_id"] = parent_id
+            chunk["leaf_index"] = idx
+            yield chunk
+
+
+def _parent_id(group: list[dict]) -> str:
+    """12-hex-char BLAKE2b of the group's parent text, hashed leaf by leaf.
+
+    Equal to hashing "\n\n".join(leaf texts) without encoding the joined string.
+    """
+    h = hashlib.blake2b(digest_size=6)
+    for idx, chunk in enumerate(group):
+        if idx:
+            h.update(b"\n\n")
+        h.update(chunk["text"].encode())
+    return h.hexdigest()
 
 
 def _split_parent_group(
     group: list[dict], max_tokens: int
 ) -> list[list[dict]]:
-    """Split a group of chunks into sub-groups that fit within max_tokens."""
+    """Split a group of chunks into sub-groups that fit within max_tokens.
+
+    Cut points come from a bisect over the running token total, so the
+    greedy fill costs one search per sub-group rather than a branch per chunk.
+    """
+    # totals[i] = tokens in group[:i]
+    totals = [0, *itertools.accumulate(_chunk_tokens(c) for c in group)]
     sub_groups: list[list[dict]] = []
-    current: list[dict] = []
-    current_tokens = 0
-
-    for chunk in group:
-        chunk_tokens = _estimate_tokens(chunk["text"])
-        if current and current_tokens + chunk_tokens > max_tokens:
-            sub_groups.append(current)
-            current = [chunk]
-            current_tokens = chunk_tokens
-        else:
-            current.append(chunk)
-            current_tokens += chunk_tokens
+    start = 0
 
-    if current:
-        sub_groups.append(current)
+    while start < len(group):
+        # Furthest end whose running total stays within budget; always take one chunk
+        end = bisect.bisect_right(totals, totals[start] + max_tokens) - 1
+        end = max(end, start + 1)
+        sub_groups.append(group[start:end])
+        start = end
 
     return sub_groups
 
@@ -332,32 +456,112 @@ def _split_parent_group(
 def process_file(file_path: Path) -> list[dict]:
     """Full pipeline: file → markdown → split → size enforce → parent-child pairs.
 
-    Returns list of leaf chunks ready for embedding and storage.
+    Returns list of leaf chunks ready for embedding and storage. Results are
+    cached per (path, mtime, size), so re-processing an unchanged file is
+    free; callers get their own copies, so edits don't leak into the cache.
     """
-    logger.info("Processing file: %s", file_path.name)
+    stat = file_path.stat()
+    return [dict(c) for c in _process_file_cached(file_path, stat.st_mtime_ns, stat.st_size)]
 
-    # Step 1: Convert to markdown
-    markdown_text = convert_to_markdown(file_path)
 
-    # Step 2: Split by headers
-    chunks = split_markdown_by_headers(markdown_text, file_path.name)
+# Only the handful of files one upload re-reads; each entry pins its parent text
+@functools.lru_cache(maxsize=8)
+def _process_file_cached(file_path: Path, mtime_ns: int, size: int) -> tuple[dict, ...]:
+    """Cached body of process_file; mtime_ns and size are only part of the key."""
+    logger.info("Processing file: %s", file_path.name)
+    return tuple(chunk_markdown(convert_to_markdown(file_path), file_path.name))
 
-    # Step 3: Enforce size limits
-    chunks = enforce_chunk_sizes(chunks)
 
-    # Step 4: Create parent-child pairs
-    chunks = create_parent_child_pairs(chunks)
+def chunk_markdown(markdown_text: str, filename: str) -> list[dict]:
+    """Split → size enforce → parent-child pairs for already-converted markdown.
 
-    # Log summary
-    if chunks:
-        avg_tokens = sum(_estimate_tokens(c["text"]) for c in chunks) // len(chunks)
+    Stages are chained generators; only the final leaf list is materialized.
+    """
+    chunks = list(
+        _iter_parent_child_pairs(
+            _iter_sized_chunks(
+                _iter_header_chunks(markdown_text, filename),
+                min_tokens=100,
+                max_tokens=500,
+            ),
+            parent_max_tokens=2000,
+        )
+    )
+
+    # Log summary — the average walks every chunk, so skip it when INFO is off
+    if chunks and logger.isEnabledFor(logging.INFO):
+        avg_tokens = sum(_chunk_tokens(c) for c in chunks) // len(chunks)
         logger.info(
             "Chunked %s: %d leaf chunks, avg ~%d tokens each",
-            file_path.name,
+            filename,
             len(chunks),
             avg_tokens,
         )
-    else:
-        logger.warning("No chunks produced from %s", file_path.name)
+    elif not chunks:
+        logger.warning("No chunks produced from %s", filename)
 
     return chunks
+
+
+# Below this much input, handing files to workers costs more than chunking them here
+_POOL_MIN_BYTES = 2_000_000
+
+
+def _init_worker(log_queue, level: int) -> None:
+    """Process-pool initializer: route worker "forge" logs back to the parent."""
+    forge_logger = logging.getLogger("forge")
+    forge_logger.handlers[:] = [QueueHandler(log_queue)]
+    forge_logger.setLevel(level)
+    forge_logger.propagate = False
+
+
+@functools.cache
+def _get_pool() -> ProcessPoolExecutor:
+    """Worker pool shared by every process_files call, started on first use.
+
+    Worker log records are shipped back over a queue and emitted by the
+    parent's "forge" handlers, so only one process ever writes the rotating
+    log file.
+    """
+    # Spawn rather than fork: the Streamlit server is multi-threaded
+    mp_context = multiprocessing.get_context("spawn")
+    log_queue = mp_context.Queue()
+    forge_logger = logging.getLogger("forge")
+    QueueListener(log_queue, *forge_logger.handlers, respect_handler_level=True).start()
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count() or 1,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(log_queue, forge_logger.getEffectiveLevel()),
+    )
+
+
+def _chunk_file(file_path: Path, markdown_text: str | None) -> list[dict]:
+    """Chunk one file, converting it first unless its markdown is given."""
+    if markdown_text is None:
+        return process_file(file_path)
+    return chunk_markdown(markdown_text, file_path.name)
+
+
+def process_files(
+    paths: list[Path], markdown: dict[str, str] | None = None
+) -> dict[str, list[dict]]:
+    """Chunk several files, in parallel worker processes for large batches.
+
+    Returns {filename: leaf_chunks}. markdown maps filenames to text the
+    caller already converted, so those files aren't converted again. Small
+    batches are processed in-process, since the pool would only add overhead.
+
+    Raises:
+        FileConversionError: If any file fails to convert.
+    """
+    markdown = markdown or {}
+    texts = [markdown.get(p.name) for p in paths]
+    total_bytes = sum(
+        len(text) if text is not None else p.stat().st_size for p, text in zip(paths, texts)
+    )
+    if len(paths) <= 1 or total_bytes < _POOL_MIN_BYTES:
+        results = [_chunk_file(p, text) for p, text in zip(paths, texts)]
+    else:
+        results = list(_get_pool().map(_chunk_file, paths, texts))
+    return {p.name: chunks for p, chunks in zip(paths, results)}
@@ -1,7 +1,6 @@
 import os
 
 MODEL_NAME = "claude-sonnet-4-5-20250929"
-PHASE_A_MODEL = "claude-sonnet-4-5-20250929"
 MAX_CONVERSATION_TURNS = 50  # Safety limit
 
 # --- RAG / Embedding Settings ---
@@ -12,9 +11,14 @@ EMBEDDING_DIMENSIONS = 512
 LEAF_CHUNK_MIN_TOKENS = 100
 LEAF_CHUNK_MAX_TOKENS = 500
 PARENT_CHUNK_MAX_TOKENS = 2000
+CHROMA_ADD_BATCH_SIZE = 250  # Max records per collection.add call
 
 MAX_DOCUMENT_RESULTS = 4
 MAX_CONVERSATION_RESULTS = 3
 ALWAYS_ON_TURN_WINDOW = 3
 
 TURN_SUMMARY_MODEL = os.getenv("TURN_SUMMARY_MODEL", "claude-haiku-4-5-20251001")
+
+# Phase A is a short JSON-only routing call, so it runs on the summary model.
+# Messages that signal a contradiction escalate to MODEL_NAME.
+PHASE_A_MODEL = os.getenv("PHASE_A_MODEL", TURN_SUMMARY_MODEL)
@@ -5,7 +5,12 @@
 #   MODE1_PROBES            — dict keyed by probe name, looked up via Phase A routing
 #   MODE1_PATTERNS          — dict keyed by pattern name, looked up via Phase A routing
 #
-# Plus backward-compatible MODE1_KNOWLEDGE that joins everything (removed after orchestrator refactor).
+# Plus build_mode1_knowledge() for selective injection without RAG, and a
+# backward-compatible MODE1_KNOWLEDGE that joins everything, built lazily on first
+# access (removed after orchestrator refactor).
+
+import functools
+from collections.abc import Iterable
 
 MODE1_CORE_INSTRUCTIONS = """
 # Mode 1: Discover & Frame — Full Specification (v2)
@@ -703,10 +708,27 @@ confidence: "guessed"
 **Timing:** Usually triggers late — requires understanding of solution's investment profile.""",
 }
 
+def build_mode1_knowledge(probe_keys: Iterable[str], pattern_keys: Iterable[str]) -> str:
+    """Only the named probes and patterns, in knowledge-base order.
+
+    Core instructions are not included — Phase B sends them as a system
+    block. Unknown keys are skipped.
+    """
+    probe_keys, pattern_keys = set(probe_keys), set(pattern_keys)
+    return "\n\n".join([
+        *(body for key, body in MODE1_PROBES.items() if key in probe_keys),
+        *(body for key, body in MODE1_PATTERNS.items() if key in pattern_keys),
+    ])
+
+
 # Backward-compatible export — joins everything into a single string.
-# Used by current orchestrator.py imports. Will be removed after orchestrator refactor.
-MODE1_KNOWLEDGE = (
-    MODE1_CORE_INSTRUCTIONS
-    + "\n\n" + "\n\n".join(MODE1_PROBES.values())
-    + "\n\n" + "\n\n".join(MODE1_PATTERNS.values())
-)
+# Built on first access (module __getattr__). Will be removed after orchestrator refactor.
+@functools.cache
+def _joined_knowledge() -> str:
+    return MODE1_CORE_INSTRUCTIONS + "\n\n" + build_mode1_knowledge(MODE1_PROBES, MODE1_PATTERNS)
+
+
+def __getattr__(name: str):
+    if name == "MODE1_KNOWLEDGE":
+        return _joined_knowledge()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
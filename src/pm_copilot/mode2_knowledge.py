@@ -1,14 +1,24 @@
 # mode2_knowledge.py — Decomposed for RAG-based selective injection
 #
 # Four exports:
-#   MODE2_CORE_INSTRUCTIONS — always sent to Phase B (behavioral meta-rules)
+#   MODE2_CORE_INSTRUCTIONS — always sent to Phase B (behavioral meta-rules);
+#                             also exported as MODE2_CORE_STATIC + MODE2_CORE_DYNAMIC
 #   MODE2_PROBES            — dict keyed by probe name, looked up via Phase A routing
-#   MODE2_RISK_FRAMEWORK    — Cagan four-risk-dimension framework (always included in Mode 2)
+#   MODE2_RISK_FRAMEWORK    — Cagan four-risk-dimension framework (always included in Mode 2);
+#                             also exported as MODE2_RISK_FRAMEWORK_RULES + _EXAMPLES
 #   MODE2_PATTERNS          — dict keyed by pattern name, looked up via Phase A routing
 #
-# Plus backward-compatible MODE2_KNOWLEDGE that joins everything (removed after orchestrator refactor).
+# Plus build_mode2_knowledge() for selective injection without RAG, and a
+# backward-compatible MODE2_KNOWLEDGE that joins everything, built lazily on first
+# access (removed after orchestrator refactor).
 
-MODE2_CORE_INSTRUCTIONS = """
+import functools
+from collections.abc import Iterable
+
+# Core instructions are split at the end of Section 3: sections 0-3 (system
+# fit, core question, inheritance, failure modes) form the leading cacheable
+# block; sections 5-9 (patterns, artifact, lifecycle, tools) follow it.
+MODE2_CORE_STATIC = """
 # Mode 2: Evaluate Solution — Specification
 
 ## 0. How This Fits Into the System
@@ -82,7 +92,9 @@ If Mode 2 is entered WITHOUT Mode 1 (user claims problem is already validated):
 
 ---
 
-## 5. Domain Patterns for Mode 2
+"""
+
+MODE2_CORE_DYNAMIC = """## 5. Domain Patterns for Mode 2
 
 Mode 1's 8 domain patterns are problem-discovery patterns. Mode 2 needs solution-evaluation patterns. Some Mode 1 patterns carry forward (Analytics-Execution Gap is relevant to feasibility), but Mode 2 adds its own patterns.
 
@@ -350,8 +362,12 @@ Handler writes to: `go_no_go_recommendation`, `go_no_go_conditions`, `go_no_go_d
 *Inherits: Assumption register, document skeleton, org context, stakeholder map from Mode 1*
 """
 
+MODE2_CORE_INSTRUCTIONS = MODE2_CORE_STATIC + MODE2_CORE_DYNAMIC
+
 # Three-layer risk identification framework — always included when Mode 2 is active.
-MODE2_RISK_FRAMEWORK = """
+# Split into rules (always injected) and the BAD/GOOD quality-bar examples, which
+# the RAG path only injects on turns that surface Layer 3 risks.
+_RISK_FRAMEWORK_LAYERS = """
 ## 4. Risk Identification Approach
 
 ### 4.1 Three-Layer Risk Identification
@@ -373,7 +389,9 @@ The knowledge base will NOT enumerate risks by domain. Instead, it will contain
 
 > After identifying the solution type (ML model, data pipeline, customer-facing tool, internal platform, integration, etc.) and the operating domain (marketing, supply chain, finance, retail operations, R&D, etc.), use your subject matter expertise to generate 6-8 risks specific to this combination. Then prioritize and surface only the 3-4 highest-impact, least-obvious ones to the user.
 
-**Quality bar — two examples of the difference:**
+"""
+
+MODE2_RISK_FRAMEWORK_EXAMPLES = """**Quality bar — two examples of the difference:**
 
 BAD (generic): "You should consider model scalability and data quality."
 
@@ -383,7 +401,9 @@ BAD (generic): "Consider user adoption challenges."
 
 GOOD (domain-expert): "Marketing teams typically have deeply embedded workflows around campaign planning tools. Solutions that require marketers to check a separate dashboard or change their planning sequence face much higher adoption friction than solutions that integrate into existing tools like their campaign management platform. Where does this solution sit relative to their current daily workflow?"
 
-**Prioritization rule:**
+"""
+
+_RISK_FRAMEWORK_PRIORITIZATION = """**Prioritization rule:**
 - Skip risks the PM has likely already considered (obvious ones)
 - Lead with risks that are domain-specific or solution-type-specific and easy to miss
 - Register all identified risks as assumptions with confidence "guessed" and recommended validation actions — the system isn't claiming these are definitive, it's saying "based on solutions like this in domains like this, these are worth investigating"
@@ -398,6 +418,11 @@ GOOD (domain-expert): "Marketing teams typically have deeply embedded workflows
 Seven probes for solution evaluation. Like Mode 1, not every probe fires for every input.
 """
 
+MODE2_RISK_FRAMEWORK_RULES = _RISK_FRAMEWORK_LAYERS + _RISK_FRAMEWORK_PRIORITIZATION
+MODE2_RISK_FRAMEWORK = (
+    _RISK_FRAMEWORK_LAYERS + MODE2_RISK_FRAMEWORK_EXAMPLES + _RISK_FRAMEWORK_PRIORITIZATION
+)
+
 # Probe definitions — looked up by key based on Phase A's next_probe output.
 # Keys are descriptive names matching the probe's focus area.
 MODE2_PROBES = {
@@ -575,11 +600,34 @@ MODE2_PATTERNS = {
 **What it does:** Asks: "What systems does this need to connect to? Who owns those systems? Have you discussed this integration with them? What's their roadmap and availability?" """,
 }
 
+def build_mode2_knowledge(probe_keys: Iterable[str], pattern_keys: Iterable[str]) -> str:
+    """Only the named probes and patterns, in knowledge-base order.
+
+    Core instructions and the risk framework are not included — Phase B sends
+    those as system blocks. Unknown keys are skipped.
+    """
+    probe_keys, pattern_keys = set(probe_keys), set(pattern_keys)
+    return "\n\n".join([
+        *(body for key, body in MODE2_PROBES.items() if key in probe_keys),
+        *(body for key, body in MODE2_PATTERNS.items() if key in pattern_keys),
+    ])
+
+
 # Backward-compatible export — joins everything into a single string.
-# Used by current orchestrator.py imports. Will be removed after orchestrator refactor.
-MODE2_KNOWLEDGE = (
-    MODE2_CORE_INSTRUCTIONS
-    + "\n\n" + MODE2_RISK_FRAMEWORK
-    + "\n\n" + "\n\n".join(MODE2_PROBES.values())
-    + "\n\n" + "\n\n".join(MODE2_PATTERNS.values())
-)
+# Built on first access (module __getattr__), so processes that only use
+# selective injection never hold a second copy of the knowledge base.
+# Will be removed after orchestrator refactor.
+@functools.cache
+def _joined_knowledge() -> str:
+    return (
+        MODE2_CORE_INSTRUCTIONS
+        + "\n\n" + MODE2_RISK_FRAMEWORK
+        + "\n\n" + "\n\n".join(MODE2_PROBES.values())
+        + "\n\n" + "\n\n".join(MODE2_PATTERNS.values())
+    )
+
+
+def __getattr__(name: str):
+    if name == "MODE2_KNOWLEDGE":
+        return _joined_knowledge()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,15 @@
-import json
+import functools
+import logging
+import re
+import sys
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+import orjson
 import streamlit as st
 from dotenv import load_dotenv  # load .env before Anthropic client
 load_dotenv()
 
-from anthropic import Anthropic
 from .tools import handle_tool_call, TOOL_DEFINITIONS
 from .prompts import (
     SYSTEM_PROMPT,
@@ -12,36 +18,107 @@ from .prompts import (
     PHASE_B_MODE1_PROMPT,
     PHASE_B_MODE2_PROMPT,
 )
-from .mode1_knowledge import MODE1_KNOWLEDGE, MODE1_CORE_INSTRUCTIONS
-from .mode2_knowledge import MODE2_KNOWLEDGE, MODE2_CORE_INSTRUCTIONS
+from .mode1_knowledge import MODE1_CORE_INSTRUCTIONS, build_mode1_knowledge
+from .mode2_knowledge import (
+    build_mode2_knowledge,
+    MODE2_CORE_STATIC,
+    MODE2_CORE_DYNAMIC,
+    MODE2_RISK_FRAMEWORK_RULES,
+    MODE2_RISK_FRAMEWORK_EXAMPLES,
+)
 from .org_context import format_org_context
 from . import config
 from .config import MODEL_NAME
-from .rag import ForgeRAG, _create_chroma_client, _create_voyage_client
 from .persistence import save_project, _load_context_file
 from .logging_config import setup_logging
+
+if TYPE_CHECKING:
+    from .rag import ForgeRAG
 logger = setup_logging()
 
 
-client = Anthropic()
+@functools.cache
+def _get_client():
+    """The shared Anthropic client, created (and anthropic imported) on first use.
+
+    The SDK's pool drops idle connections after 5s, so nearly every turn paid a
+    fresh TLS handshake. Keep a few connections alive across user think time.
+    """
+    import httpx
+    from anthropic import Anthropic, DefaultHttpxClient
+
+    return Anthropic(
+        http_client=DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=120.0),
+        ),
+    )
+
+# Phase B system blocks, most stable first: the static knowledge for the
+# active mode, then org context (see _build_phase_b_system), each ending in a
+# prompt-cache breakpoint. Only per-turn sections go in the user prompt.
+_CACHE_BREAKPOINT = {"type": "ephemeral"}
+_ORCHESTRATOR_SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT}]
+_MODE1_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT},
+    {"type": "text", "text": MODE1_CORE_INSTRUCTIONS, "cache_control": _CACHE_BREAKPOINT},
+]
+# Mode 2: the static half of the core instructions is its own breakpoint, followed
+# by the rest of the core instructions and the risk framework rules (always part
+# of Mode 2).
+_MODE2_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT},
+    {"type": "text", "text": MODE2_CORE_STATIC, "cache_control": _CACHE_BREAKPOINT},
+    {"type": "text", "text": MODE2_CORE_DYNAMIC + "\n\n" + MODE2_RISK_FRAMEWORK_RULES},
+]
+# Quality-bar examples only go out on Layer 3 turns. They ride in the per-turn
+# prompt, after every breakpoint: the history breakpoint's prefix includes all
+# system blocks, so toggling a system block would re-prefill the conversation.
+_MODE2_RISK_EXAMPLES = "\n\n" + MODE2_RISK_FRAMEWORK_EXAMPLES
+_LAYER3_RISK_PROBES = frozenset({"Value Risk", "Usability Risk", "Feasibility Risk", "Viability Risk"})
+_KNOWLEDGE_IN_SYSTEM_NOTE = (
+    "(Core instructions are in the system prompt. Turn-specific knowledge follows.)"
+)
+_ORG_CONTEXT_IN_SYSTEM_NOTE = "(In the system prompt.)"
+# The API expects a user turn first; new projects open with the priming reply.
+_CONVERSATION_START = {"role": "user", "content": "(Conversation start.)"}
+# Tools sit ahead of the system prompt in the cache prefix; a breakpoint on the
+# last definition caches all of them. Together with the system breakpoints and
+# the moving tool-loop breakpoint this stays within the API's limit of four.
+_PHASE_B_TOOLS = [
+    *TOOL_DEFINITIONS[:-1],
+    {**TOOL_DEFINITIONS[-1], "cache_control": _CACHE_BREAKPOINT},
+]
+
+
+# Worker threads for retrieval that only depends on the user message, so it
+# overlaps the Phase A call. Workers never touch st.session_state.
+_retrieval_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="forge-retrieval")
+# Turn summary + indexing happens after the reply is shown. One worker keeps
+# turns indexed in order.
+_summary_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forge-summary")
 
 
 @st.cache_resource
 def _get_chroma_client(vectordb_path: str):
     """Cached ChromaDB client singleton — avoids SQLite thread-lock errors."""
+    from .rag import _create_chroma_client
     return _create_chroma_client(vectordb_path)
 
 
 @st.cache_resource
 def _get_voyage_client(api_key: str):
     """Cached Voyage AI client singleton."""
+    from .rag import _create_voyage_client
     return _create_voyage_client(api_key)
 
 
-def run_turn(user_message: str) -> str:
+def run_turn(user_message: str, on_text: Callable[[str], None] | None = None) -> str:
     """
     Process one user turn through the two-phase architecture.
     Returns the assistant's response text.
+
+    If on_text is given, Phase B streams and on_text receives each text delta
+    as it arrives.
     """
     if user_message == "__PRIMING_TURN__":
         st.session_state.turn_count += 1
@@ -68,6 +145,7 @@ def run_turn(user_message: str) -> str:
 
     # Add user message to history
     st.session_state.messages.append({"role": "user", "content": user_message})
+    st.session_state.last_user_msg_idx = len(st.session_state.messages) - 1
 
     # Re-read context.md to capture manual edits
     if hasattr(st.session_state, 'project_dir') and st.session_state.project_dir:
@@ -76,6 +154,7 @@ def run_turn(user_message: str) -> str:
     # Initialize RAG if needed (uses @st.cache_resource singletons from app.py)
     if st.session_state.project_dir and st.session_state.rag is None:
         try:
+            from .rag import ForgeRAG  # ChromaDB + Voyage load on the first project turn
             chroma = _get_chroma_client(str(st.session_state.project_dir / "vectordb"))
             voyage = _get_voyage_client(config.VOYAGE_API_KEY) if config.VOYAGE_API_KEY else None
             st.session_state.rag = ForgeRAG(
@@ -83,24 +162,35 @@ def run_turn(user_message: str) -> str:
                 chroma_client=chroma,
                 voyage_client=voyage,
             )
+            _retrieval_pool.submit(st.session_state.rag.warm_up)
         except Exception as e:
             logger.warning("RAG initialization failed: %s", e)
 
+    # --- Conversation retrieval runs alongside Phase A ---
+    # Document retrieval waits: its query includes Phase A's next_probe.
+    rag = st.session_state.rag
+    conversations_future = None
+    if rag and rag.enabled:
+        conversations_future = _retrieval_pool.submit(
+            rag.prefetch_conversations, user_message, st.session_state.turn_count
+        )
+
     # --- PHASE A: Route ---
     routing_decision = _run_phase_a(user_message)
 
     # --- Context Assembly (with retrieval bypass for filler turns) ---
     assembled = None
-    if st.session_state.rag and st.session_state.rag.enabled:
+    if rag and rag.enabled:
         if routing_decision.get("requires_retrieval", True):
-            assembled = st.session_state.rag.assemble_context(
+            assembled = rag.assemble_context(
                 user_message=user_message,
                 phase_a_decision=routing_decision,
                 current_turn=st.session_state.turn_count,
                 project_state=st.session_state.project_state,
+                retrieved_conversations=conversations_future.result(),
             )
         else:
-            assembled = st.session_state.rag.assemble_context_minimal(
+            assembled = rag.assemble_context_minimal(
                 phase_a_decision=routing_decision,
                 current_turn=st.session_state.turn_count,
                 project_state=st.session_state.project_state,
@@ -108,7 +198,7 @@ def run_turn(user_message: str) -> str:
             logger.info("Retrieval bypassed — filler turn detected by Phase A")
 
     # --- PHASE B: Act ---
-    response_text = _run_phase_b(routing_decision, assembled_context=assembled)
+    response_text = _run_phase_b(routing_decision, assembled_context=assembled, on_text=on_text)
 
     # Add assistant response to history
     st.session_state.messages.append({"role": "assistant", "content": response_text})
@@ -124,6 +214,30 @@ def run_turn(user_message: str) -> str:
     return response_text
 
 
+# All of PHASE_A_PROMPT's slots precede the routing instructions, so only that
+# head is run through str.format each turn; the static tail is unescaped once.
+_PHASE_A_HEAD, _PHASE_A_TAIL = PHASE_A_PROMPT.split("## Routing Logic", 1)
+_PHASE_A_TAIL = ("## Routing Logic" + _PHASE_A_TAIL).replace("{{", "{").replace("}}", "}")
+
+# Cheap signal that the user is contradicting earlier input; conflict_flags
+# reasoning is the one part of routing worth the larger model. Only explicit
+# contradiction phrases: everyday words like "actually" would escalate often.
+_CONFLICT_HINT = re.compile(
+    r"\b(contradict\w*|conflict\w*|inconsistent|changed my mind|"
+    r"that['’]s wrong|not what i said)\b",
+    re.IGNORECASE,
+)
+
+
+def _phase_a_model(user_message: str) -> str:
+    """Pick the routing model: PHASE_A_MODEL unless the message hints at a conflict."""
+    match = _CONFLICT_HINT.search(user_message)
+    if match:
+        logger.info("Phase A escalated to %s on conflict hint %r", MODEL_NAME, match.group(0))
+        return MODEL_NAME
+    return config.PHASE_A_MODEL
+
+
 def _run_phase_a(user_message: str) -> dict:
     """
     Lightweight routing call. Reads state, decides what to do next.
@@ -144,11 +258,11 @@ def _run_phase_a(user_message: str) -> dict:
 
     # Get recent messages (last 3 turns = 6 messages)
     recent = st.session_state.messages[-6:]
-    recent_text = "\n".join(
+    recent_text = "\n".join([
         f"{m['role'].upper()}: {m['content']}" for m in recent
-    )
+    ])
 
-    prompt = PHASE_A_PROMPT.format(
+    prompt = _PHASE_A_HEAD.format(
         turn_count=st.session_state.turn_count,
         current_phase=st.session_state.current_phase,
         active_mode=st.session_state.active_mode,
@@ -161,28 +275,27 @@ def _run_phase_a(user_message: str) -> dict:
         original_input=original_input,
         conversation_summary=conversation_summary or "(No summary yet — first turn)",
         org_context_domain=st.session_state.org_context.get("last_enriched_domain", ""),
-    )
+    ) + _PHASE_A_TAIL
 
     try:
-        response = client.messages.create(
-            model=MODEL_NAME,
+        response = _get_client().messages.create(
+            model=_phase_a_model(user_message),
             max_tokens=500,
             system="You are a routing engine. Respond ONLY with valid JSON. No markdown, no explanation.",
             messages=[{"role": "user", "content": prompt}],
         )
 
-        logger.debug(
-            "API usage - input_tokens: %d, output_tokens: %d, stop_reason: %s",
-            response.usage.input_tokens, response.usage.output_tokens, response.stop_reason,
-        )
+        _log_usage(response)
 
         # Parse JSON from response
         raw = response.content[0].text.strip()
         # Handle potential markdown code fence
         if raw.startswith("```"):
             raw = raw.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-        routing = json.loads(raw)
-        logger.info("Phase A decision: %s", json.dumps(routing))
+        routing = orjson.loads(raw)
+        if isinstance(routing.get("next_probe"), str):
+            routing["next_probe"] = sys.intern(routing["next_probe"])
+        logger.info("Phase A decision: %s", orjson.dumps(routing).decode())
     except Exception:
         # Fallback: continue with safe default
         routing = {
@@ -221,11 +334,16 @@ def _run_phase_a(user_message: str) -> dict:
     return routing
 
 
-def _run_phase_b(routing_decision: dict, assembled_context: dict | None = None) -> str:
+def _run_phase_b(
+    routing_decision: dict,
+    assembled_context: dict | None = None,
+    on_text: Callable[[str], None] | None = None,
+) -> str:
     """
     Heavy execution call. Either orchestrator questioning or mode execution.
     Handles tool calls in a loop until the model stops calling tools.
-    Returns the final text response.
+    Returns the final text response. With on_text, each API call streams and
+    text deltas are passed to on_text as they arrive.
 
     If assembled_context is provided (RAG enabled), uses targeted context
     instead of full knowledge base dumps. Falls back to legacy behavior
@@ -234,37 +352,55 @@ def _run_phase_b(routing_decision: dict, assembled_context: dict | None = None)
     logger.info("Phase B executing: %s", st.session_state.active_mode or "orchestrator")
 
     phase_b_prompt = _build_phase_b_prompt(routing_decision, assembled_context)
-
-    # Context window safety check
-    estimated_tokens = len(phase_b_prompt) // 4
-    if estimated_tokens > 150000:
-        messages = st.session_state.messages
-        if len(messages) > 22:
-            first_msg = messages[0]
-            recent_msgs = messages[-20:]
-            truncated = [first_msg, {"role": "assistant", "content": "[...earlier conversation truncated for context length...]"}] + recent_msgs
-            phase_b_prompt = _build_phase_b_prompt(
-                routing_decision, assembled_context, messages_override=truncated
-            )
-
-    # Build messages for API call
-    api_messages = [{"role": "user", "content": phase_b_prompt}]
+    org_context = (
+        assembled_context["context_block"] if assembled_context is not None
+        else format_org_context()
+    )
+    phase_b_system = _build_phase_b_system(org_context)
+
+    # Context window safety check: truncate up front when the history alone is
+    # clearly over budget; the exact count catches the rest.
+    messages = st.session_state.messages
+    can_truncate = len(messages) > 22
+    history = messages
+    if can_truncate and sum(len(m["content"]) for m in messages) > _HISTORY_TRUNCATE_CHARS:
+        history = _truncate_history(messages)
+    api_messages = _build_phase_b_messages(history, phase_b_prompt)
+    if can_truncate and history is messages and _exceeds_context_budget(phase_b_system, api_messages):
+        api_messages = _build_phase_b_messages(_truncate_history(messages), phase_b_prompt)
 
     # Tool use loop with error handling
+    client = _get_client()
     final_text = ""
+    # The history breakpoint, if any, sits on the message before the prompt
+    cached_block = api_messages[-2]["content"][0] if len(api_messages) > 1 else None
+    max_tokens = _MAX_TOKENS_BY_ACTION.get(
+        (routing_decision or {}).get("next_action"), _DEFAULT_MAX_TOKENS
+    )
     try:
         while True:
-            response = client.messages.create(
+            request = dict(
                 model=MODEL_NAME,
-                max_tokens=8096,
-                system=SYSTEM_PROMPT,
+                max_tokens=max_tokens,
+                system=phase_b_system,
                 messages=api_messages,
-                tools=TOOL_DEFINITIONS,
-            )
-            logger.debug(
-                "API usage - input_tokens: %d, output_tokens: %d, stop_reason: %s",
-                response.usage.input_tokens, response.usage.output_tokens, response.stop_reason,
+                tools=_PHASE_B_TOOLS,
             )
+            if on_text is None:
+                response = client.messages.create(**request)
+            else:
+                with client.messages.stream(**request) as stream:
+                    for delta in stream.text_stream:
+                        on_text(delta)
+                    response = stream.get_final_message()
+            _log_usage(response)
+            if response.stop_reason == "max_tokens" and max_tokens < _PHASE_B_MAX_TOKENS:
+                # A cut-off reply or half-written tool input must not be used;
+                # redo the call at the full budget. Streamed partial text is
+                # replaced by the final text the app renders.
+                logger.info("Phase B hit max_tokens=%d, retrying at %d", max_tokens, _PHASE_B_MAX_TOKENS)
+                max_tokens = _PHASE_B_MAX_TOKENS
+                continue
 
             # Process response content blocks
             tool_calls_made = False
@@ -278,6 +414,9 @@ def _run_phase_b(routing_decision: dict, assembled_context: dict | None = None)
                     # generate_artifact output bypasses model — rendered directly to user
                     if block.name == "generate_artifact":
                         final_text += "\n\n" + result
+                        # Show it now rather than after the follow-up call
+                        if on_text is not None:
+                            on_text("\n\n" + result)
                         tool_results.append({
                             "type": "tool_result",
                             "tool_use_id": block.id,
@@ -296,7 +435,15 @@ def _run_phase_b(routing_decision: dict, assembled_context: dict | None = None)
 
             # If tool calls were made, append assistant response + tool results and continue
             api_messages.append({"role": "assistant", "content": response.content})
+            # Move the message breakpoint to the newest tool result so the next
+            # iteration reads everything before it from cache
+            if cached_block is not None:
+                del cached_block["cache_control"]
+            cached_block = tool_results[-1]
+            cached_block["cache_control"] = _CACHE_BREAKPOINT
             api_messages.append({"role": "user", "content": tool_results})
+            # Follow-ups after tool results can carry the heavy output
+            max_tokens = _PHASE_B_MAX_TOKENS
 
     except Exception as e:
         if final_text:
@@ -312,88 +459,166 @@ def _run_phase_b(routing_decision: dict, assembled_context: dict | None = None)
     return final_text
 
 
-def _build_phase_b_prompt(
-    routing_decision: dict,
-    assembled_context: dict | None = None,
-    messages_override: list | None = None,
-) -> str:
-    """Build the Phase B prompt, using assembled context when available.
+# Output budget for Phase B's first call, keyed by Phase A's next_action.
+# Tool inputs count as output, so question turns keep headroom for
+# assumption registration.
+_PHASE_B_MAX_TOKENS = 8096
+_DEFAULT_MAX_TOKENS = 4096
+_MAX_TOKENS_BY_ACTION = {
+    "ask_questions": 2048,
+    "flag_conflict": 2048,
+    "micro_synthesize": 2048,
+    "complete_mode": 4096,
+    "enter_mode": _PHASE_B_MAX_TOKENS,
+    "continue_mode": _PHASE_B_MAX_TOKENS,
+}
+
+
+# Prompts shorter than this can't approach the budget even at ~2 chars/token,
+# so they skip the count_tokens round trip
+_TOKEN_COUNT_MIN_CHARS = 360_000
+_MAX_PROMPT_TOKENS = 180_000
+# History this long is over budget at any plausible chars/token ratio
+_HISTORY_TRUNCATE_CHARS = 4 * _MAX_PROMPT_TOKENS
+
+
+def _truncate_history(messages: list) -> list:
+    """First message plus the last 20, with a truncation marker between."""
+    marker = {"role": "assistant", "content": "[...earlier conversation truncated for context length...]"}
+    return [messages[0], marker] + messages[-20:]
+
+
+def _exceeds_context_budget(system: str | list[dict], api_messages: list[dict]) -> bool:
+    """Whether the Phase B request is over budget, by exact token count."""
+    # System (mode core, risk rules, org context) counts toward the budget too
+    chars = sum(
+        len(c) if isinstance(c, str) else sum(len(b["text"]) for b in c)
+        for c in (system, *(m["content"] for m in api_messages))
+    )
+    if chars < _TOKEN_COUNT_MIN_CHARS:
+        return False
+    try:
+        tokens = _get_client().messages.count_tokens(
+            model=MODEL_NAME,
+            system=system,
+            messages=api_messages,
+            tools=_PHASE_B_TOOLS,
+        ).input_tokens
+    except Exception as e:
+        logger.warning("Token count failed, using length estimate: %s", e)
+        tokens = chars // 3
+    return tokens > _MAX_PROMPT_TOKENS
+
+
+def _build_phase_b_messages(history: list[dict], prompt: str) -> list[dict]:
+    """Prior turns as API messages, then the per-turn prompt as the last user message.
 
-    If assembled_context is None, falls back to legacy behavior (full
-    knowledge base, full org context). This ensures the app works
-    without RAG configured.
+    The newest prior turn carries a cache breakpoint. Next turn only appends
+    after it, so that request reuses this one's prefix and prefills just the
+    new exchange. The current user message is part of the prompt, not history.
     """
-    messages = messages_override or st.session_state.messages
+    prior = history[:-1] if history and history[-1]["role"] == "user" else history
+    api_messages = [
+        {"role": "user", "content": _format_user_input(m["content"])} if m["role"] == "user"
+        else {"role": m["role"], "content": m["content"]}
+        for m in prior
+    ]
+    if api_messages:
+        if api_messages[0]["role"] != "user":
+            api_messages.insert(0, _CONVERSATION_START)
+        last = api_messages[-1]
+        last["content"] = [{"type": "text", "text": last["content"], "cache_control": _CACHE_BREAKPOINT}]
+    api_messages.append({"role": "user", "content": prompt})
+    return api_messages
+
+
+def _build_phase_b_prompt(routing_decision: dict, assembled_context: dict | None = None) -> str:
+    """Build the per-turn Phase B prompt, using assembled context when available.
+
+    If assembled_context is None, falls back to legacy behavior (knowledge
+    selected from Phase A's probes and patterns). This ensures the app works
+    without RAG configured. Core knowledge and org context are not part of
+    the prompt — they go in the system blocks (_build_phase_b_system), and
+    earlier turns go in the API messages (_build_phase_b_messages).
+    """
+    messages = st.session_state.messages
+    latest_message = (
+        _format_user_input(messages[-1]["content"]) if messages and messages[-1]["role"] == "user"
+        else "(None this turn.)"
+    )
+    phase_a_output = orjson.dumps(routing_decision, option=orjson.OPT_INDENT_2).decode()
+    mode = st.session_state.active_mode
+
+    if mode not in ("mode_1", "mode_2"):
+        return PHASE_B_ORCHESTRATOR_PROMPT.format(
+            phase_a_output=phase_a_output,
+            latest_message=latest_message,
+            org_context=_ORG_CONTEXT_IN_SYSTEM_NOTE,
+            turn_count=st.session_state.turn_count,
+        )
 
     if assembled_context is not None:
         # --- RAG-enhanced path: targeted context ---
-        if st.session_state.active_mode == "mode_1":
-            return PHASE_B_MODE1_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                full_assumptions=_format_assumptions(),
-                document_skeleton=_format_skeleton(),
-                org_context=assembled_context["context_block"],
-                mode1_knowledge=(
-                    MODE1_CORE_INSTRUCTIONS
-                    + _assembled_sections(assembled_context)
-                ),
-                turn_count=st.session_state.turn_count,
-                is_first_mode_turn=(st.session_state.routing_context["mode_turn_count"] == 0),
-            )
-        elif st.session_state.active_mode == "mode_2":
-            return PHASE_B_MODE2_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                full_assumptions=_format_assumptions(),
-                document_skeleton=_format_skeleton(),
-                org_context=assembled_context["context_block"],
-                mode2_knowledge=(
-                    MODE2_CORE_INSTRUCTIONS
-                    + _assembled_sections(assembled_context)
-                ),
-                turn_count=st.session_state.turn_count,
-                is_first_mode_turn=(st.session_state.routing_context["mode_turn_count"] == 0),
-            )
-        else:
-            return PHASE_B_ORCHESTRATOR_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                org_context=assembled_context["context_block"],
-                turn_count=st.session_state.turn_count,
-            )
+        knowledge = _KNOWLEDGE_IN_SYSTEM_NOTE + _assembled_sections(assembled_context)
     else:
-        # --- Legacy path: full knowledge base (no RAG) ---
-        org_context_text = format_org_context()
-        if st.session_state.active_mode == "mode_1":
-            return PHASE_B_MODE1_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                full_assumptions=_format_assumptions(),
-                document_skeleton=_format_skeleton(),
-                org_context=org_context_text,
-                mode1_knowledge=MODE1_KNOWLEDGE,
-                turn_count=st.session_state.turn_count,
-                is_first_mode_turn=(st.session_state.routing_context["mode_turn_count"] == 0),
-            )
-        elif st.session_state.active_mode == "mode_2":
-            return PHASE_B_MODE2_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                full_assumptions=_format_assumptions(),
-                document_skeleton=_format_skeleton(),
-                org_context=org_context_text,
-                mode2_knowledge=MODE2_KNOWLEDGE,
-                turn_count=st.session_state.turn_count,
-                is_first_mode_turn=(st.session_state.routing_context["mode_turn_count"] == 0),
-            )
-        else:
-            return PHASE_B_ORCHESTRATOR_PROMPT.format(
-                phase_a_output=json.dumps(routing_decision, indent=2),
-                full_messages=_format_messages(messages),
-                org_context=org_context_text,
-                turn_count=st.session_state.turn_count,
-            )
+        # --- Legacy path: Phase A-selected knowledge (no RAG) ---
+        probe_keys, pattern_keys = _legacy_knowledge_keys(routing_decision)
+        build_knowledge = build_mode1_knowledge if mode == "mode_1" else build_mode2_knowledge
+        knowledge = _KNOWLEDGE_IN_SYSTEM_NOTE + "\n\n" + build_knowledge(probe_keys, pattern_keys)
+    if mode == "mode_2" and _needs_risk_examples(routing_decision):
+        knowledge += _MODE2_RISK_EXAMPLES
+
+    template = PHASE_B_MODE1_PROMPT if mode == "mode_1" else PHASE_B_MODE2_PROMPT
+    return template.format(
+        phase_a_output=phase_a_output,
+        latest_message=latest_message,
+        full_assumptions=_format_assumptions(),
+        document_skeleton=_format_skeleton(),
+        org_context=_ORG_CONTEXT_IN_SYSTEM_NOTE,
+        mode1_knowledge=knowledge,  # each template uses its own mode's field
+        mode2_knowledge=knowledge,
+        turn_count=st.session_state.turn_count,
+        is_first_mode_turn=(st.session_state.routing_context["mode_turn_count"] == 0),
+    )
+
+
+def _legacy_knowledge_keys(routing_decision: dict) -> tuple[list[str], list[str]]:
+    """Probe and pattern names Phase A routed to, for the no-RAG path."""
+    probe_keys = [routing_decision.get("next_probe"), *routing_decision.get("suggested_probes", [])]
+    pattern_keys = [
+        *routing_decision.get("triggered_patterns", []),
+        *(p["name"] for p in st.session_state.routing_context["patterns_fired"]),
+    ]
+    return [k for k in probe_keys if k], pattern_keys
+
+
+def _needs_risk_examples(routing_decision: dict | None) -> bool:
+    """Layer 3 risks surface on the first Mode 2 turn and on risk-dimension probes."""
+    if not routing_decision:
+        return False
+    return (
+        routing_decision.get("next_probe") in _LAYER3_RISK_PROBES
+        or st.session_state.routing_context.get("mode_turn_count", 0) == 0
+    )
+
+
+def _build_phase_b_system(org_context: str = "") -> list[dict]:
+    """System blocks for Phase B: mode knowledge, then org context.
+
+    Org context only changes on enrichment or file uploads, so it is cached
+    as the second breakpoint; turns in between reuse the whole prefix.
+    """
+    mode = st.session_state.active_mode
+    if mode == "mode_1":
+        blocks = _MODE1_SYSTEM_BLOCKS
+    elif mode == "mode_2":
+        blocks = _MODE2_SYSTEM_BLOCKS
+    else:
+        blocks = _ORCHESTRATOR_SYSTEM_BLOCKS
+    return [
+        *blocks,
+        {"type": "text", "text": f"## OrgContext\n{org_context}", "cache_control": _CACHE_BREAKPOINT},
+    ]
 
 
 def _assembled_sections(assembled_context: dict) -> str:
@@ -410,8 +635,13 @@ def _assembled_sections(assembled_context: dict) -> str:
     return "".join(parts)
 
 
-def _post_turn_updates(routing_decision: dict, user_message: str = "", assistant_response: str = ""):
-    """Update routing context after a turn completes."""
+def _post_turn_updates(
+    routing_decision: dict, user_message: str = "", assistant_response: str = ""
+) -> Future | None:
+    """Update routing context after a turn completes.
+
+    Returns the future for background turn indexing, if one was scheduled.
+    """
     # Track micro-synthesis cadence
     if st.session_state.turn_count % 3 == 0:
         st.session_state.routing_context["micro_synthesis_due"] = True
@@ -426,21 +656,30 @@ def _post_turn_updates(routing_decision: dict, user_message: str = "", assistant
     # record_probe_fired and record_pattern_fired tools.
     # No longer inferred from routing_decision["suggested_probes"].
 
-    # Generate turn summary and index in ChromaDB (for future retrieval)
+    # Generate turn summary and index in ChromaDB (for future retrieval),
+    # off the critical path — only turns older than the always-on window are
+    # ever retrieved, so the next turn never waits on this one.
     if st.session_state.rag and st.session_state.rag.enabled:
         if st.session_state.turn_count > config.ALWAYS_ON_TURN_WINDOW:
-            try:
-                summary = _generate_turn_summary(user_message, assistant_response)
-                st.session_state.rag.index_turn(
-                    turn_number=st.session_state.turn_count,
-                    user_message=user_message,
-                    assistant_response=assistant_response,
-                    turn_summary=summary,
-                    active_probe=st.session_state.routing_context.get("active_probe", ""),
-                    active_mode=st.session_state.active_mode or "",
-                )
-            except Exception as e:
-                logger.warning("Turn indexing failed: %s", e)
+            return _summary_pool.submit(
+                _summarize_and_index_turn,
+                st.session_state.rag,
+                turn_number=st.session_state.turn_count,
+                user_message=user_message,
+                assistant_response=assistant_response,
+                active_probe=st.session_state.routing_context.get("active_probe", ""),
+                active_mode=st.session_state.active_mode or "",
+            )
+    return None
+
+
+def _summarize_and_index_turn(rag: "ForgeRAG", **turn) -> None:
+    """Summarize a turn and index it. Runs in a worker — no session state access."""
+    try:
+        summary = _generate_turn_summary(turn["user_message"], turn["assistant_response"])
+        rag.queue_turn(turn_summary=summary, **turn)
+    except Exception as e:
+        logger.warning("Turn indexing failed: %s", e)
 
 
 def _generate_turn_summary(user_message: str, assistant_response: str) -> str:
@@ -449,7 +688,7 @@ def _generate_turn_summary(user_message: str, assistant_response: str) -> str:
     Uses the same Anthropic client as all other API calls — just points
     to TURN_SUMMARY_MODEL (Haiku) instead of MODEL_NAME (Sonnet).
     """
-    response = client.messages.create(
+    response = _get_client().messages.create(
         model=config.TURN_SUMMARY_MODEL,
         max_tokens=100,
         messages=[{
@@ -465,6 +704,15 @@ def _generate_turn_summary(user_message: str, assistant_response: str) -> str:
     return response.content[0].text
 
 
+def _log_usage(response) -> None:
+    """Debug-log token usage; skips the SDK attribute reads unless DEBUG is on."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "API usage - input_tokens: %d, output_tokens: %d, stop_reason: %s",
+            response.usage.input_tokens, response.usage.output_tokens, response.stop_reason,
+        )
+
+
 # --- Helper formatters ---
 
 def _build_assumption_summary() -> str:
@@ -473,11 +721,47 @@ def _build_assumption_summary() -> str:
     if not assumptions:
         return "No assumptions registered yet."
 
-    lines = []
-    for aid, a in sorted(assumptions.items()):
-        flag = "🔴" if a["impact"] == "high" and a["confidence"] == "guessed" else ""
-        lines.append(f"{flag} {a['id']}: [{a['impact']}/{a['confidence']}/{a['status']}] {a['claim']}")
-    return "\n".join(lines)
+    rendered = _rendered_assumptions(_assumption_summary_line)
+    return "\n".join([rendered[aid] for aid in sorted(assumptions)])
+
+
+def _assumption_summary_line(a: dict) -> str:
+    flag = "🔴" if a["impact"] == "high" and a["confidence"] == "guessed" else ""
+    return f"{flag} {a['id']}: [{a['impact']}/{a['confidence']}/{a['status']}] {a['claim']}"
+
+
+def _assumption_block(a: dict) -> str:
+    return (
+        f"- **{a['id']}** [{a['type']}] {a['claim']}\n"
+        f"  Impact: {a['impact']} | Confidence: {a['confidence']} | Status: {a['status']}\n"
+        f"  Basis: {a['basis']} | Surfaced by: {a['surfaced_by']}\n"
+        f"  Depends on: {a['depends_on']} | Action: {a['recommended_action']}"
+    )
+
+
+def _rendered_assumptions(render: Callable[[dict], str]) -> dict:
+    """render(a) for every assumption, keyed by id; only dirty or new ids are re-rendered.
+
+    Tools add ids to assumption_register_dirty when they mutate an entry.
+    Replacing the register (loading a project) drops the whole cache.
+    Without a dirty set in-place edits can't be seen, so nothing is cached.
+    """
+    assumptions = st.session_state.assumption_register
+    dirty = st.session_state.get("assumption_register_dirty")
+    if dirty is None:
+        return {aid: render(a) for aid, a in assumptions.items()}
+    cache = st.session_state.get("assumption_render_cache")
+    if not cache or cache["register"] is not assumptions:
+        cache = st.session_state.assumption_render_cache = {"register": assumptions, "by_renderer": {}}
+    for rendered in cache["by_renderer"].values():
+        for aid in dirty:
+            rendered.pop(aid, None)
+    dirty.clear()
+    rendered = cache["by_renderer"].setdefault(render.__name__, {})
+    for aid, a in assumptions.items():
+        if aid not in rendered:
+            rendered[aid] = render(a)
+    return rendered
 
 
 def _format_user_input(user_message: str) -> str:
@@ -487,35 +771,34 @@ def _format_user_input(user_message: str) -> str:
     return user_message
 
 
-def _format_messages(messages: list) -> str:
-    """Format message history for prompt injection."""
-    formatted = []
-    for m in messages:
-        content = _format_user_input(m["content"]) if m["role"] == "user" else m["content"]
-        formatted.append(f"**{m['role'].upper()}:** {content}")
-    return "\n\n".join(formatted)
-
-
 def _format_assumptions() -> str:
     """Format full assumption register for mode prompts."""
     assumptions = st.session_state.assumption_register
     if not assumptions:
         return "No assumptions registered yet."
 
-    lines = []
-    for aid, a in sorted(assumptions.items()):
-        lines.append(
-            f"- **{a['id']}** [{a['type']}] {a['claim']}\n"
-            f"  Impact: {a['impact']} | Confidence: {a['confidence']} | Status: {a['status']}\n"
-            f"  Basis: {a['basis']} | Surfaced by: {a['surfaced_by']}\n"
-            f"  Depends on: {a['depends_on']} | Action: {a['recommended_action']}"
-        )
-    return "\n".join(lines)
+    rendered = _rendered_assumptions(_assumption_block)
+    return "\n".join([rendered[aid] for aid in sorted(assumptions)])
 
 
 def _format_skeleton() -> str:
-    """Format document skeleton for mode prompts."""
-    s = st.session_state.document_skeleton
+    """Format document skeleton for mode prompts, memoized on skeleton_version.
+
+    Skeleton tools bump the version; loading a project replaces the dict.
+    """
+    skeleton = st.session_state.document_skeleton
+    version = st.session_state.get("skeleton_version")
+    if version is None:
+        return _render_skeleton(skeleton)
+    cache = st.session_state.get("skeleton_render_cache")
+    if not cache or cache["skeleton"] is not skeleton or cache["version"] != version:
+        cache = st.session_state.skeleton_render_cache = {
+            "skeleton": skeleton, "version": version, "text": _render_skeleton(skeleton),
+        }
+    return cache["text"]
+
+
+def _render_skeleton(s: dict) -> str:
     parts = []
     if s["problem_statement"]:
         parts.append(f"Problem: {s['problem_statement']}")
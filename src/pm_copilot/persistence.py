@@ -1,11 +1,13 @@
 """Project persistence — save/load session state to local workspace."""
 
-import json
+import hashlib
 import logging
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 
+import orjson
 import streamlit as st
 
 from .state import init_session_state
@@ -16,6 +18,9 @@ WORKSPACE_DIR = Path.home() / "Documents" / "forge-workspace" / "projects"
 
 CURRENT_SCHEMA_VERSION = "1.0"
 
+# Append-only sidecar for st.session_state.messages (one JSON object per line)
+MESSAGES_LOG = "messages.jsonl"
+
 PERSISTED_KEYS = [
     "messages",
     "turn_count",
@@ -27,6 +32,7 @@ PERSISTED_KEYS = [
     "routing_context",
     "org_context",
     "latest_artifact",
+    "latest_artifact_kind",
     "pending_questions",
     "project_state",
 ]
@@ -39,6 +45,11 @@ def ensure_workspace_exists() -> Path:
     return WORKSPACE_DIR
 
 
+_SLUG_STRIP = re.compile(r"[^a-z0-9\s-]")
+_SLUG_WS = re.compile(r"\s+")
+_SLUG_DASH = re.compile(r"-+")
+
+
 def slugify_project_name(name: str) -> str:
     """Convert a project name to a safe directory slug.
 
@@ -46,9 +57,9 @@ def slugify_project_name(name: str) -> str:
     'Bob's Project / v2' -> 'bobs-project-v2'
     """
     slug = name.lower()
-    slug = re.sub(r"[^a-z0-9\s-]", "", slug)
-    slug = re.sub(r"\s+", "-", slug.strip())
-    slug = re.sub(r"-+", "-", slug)
+    slug = _SLUG_STRIP.sub("", slug)
+    slug = _SLUG_WS.sub("-", slug.strip())
+    slug = _SLUG_DASH.sub("-", slug)
     slug = slug.strip("-")
     if not slug:
         slug = "untitled-project"
@@ -56,32 +67,151 @@ def slugify_project_name(name: str) -> str:
 
 
 def save_project(project_dir: Path) -> None:
-    """Serialize current session state to project directory."""
-    state_data = {
+    """Serialize current session state to project directory.
+
+    Messages go to the append-only log; state.json holds everything else and
+    is skipped when that hasn't changed since the last save to the same
+    directory (last_saved alone doesn't count as a change).
+    """
+    project_name = st.session_state.get("project_name", "Untitled")
+    messages = st.session_state.get("messages", [])
+    persisted = {
+        key: st.session_state[key]
+        for key in PERSISTED_KEYS
+        if key != "messages" and key in st.session_state
+    }
+    # Non-str keys are coerced like stdlib json did, rather than aborting the save
+    body = orjson.dumps(
+        persisted, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    )
+    # The log goes first and state.json records how much of it belongs to this
+    # state, so a crash between the two writes can't leave the log ahead
+    _sync_messages_log(project_dir, messages)
+
+    fingerprint = hashlib.blake2b(body, digest_size=16)
+    fingerprint.update(orjson.dumps([project_name, len(messages)]))
+    digest = (str(project_dir), fingerprint.digest())
+    if st.session_state.get("last_saved_digest") == digest:
+        logger.debug("Project state unchanged since last save, skipping write")
+        return
+
+    header = orjson.dumps({
         "schema_version": CURRENT_SCHEMA_VERSION,
-        "project_name": st.session_state.get("project_name", "Untitled"),
+        "project_name": project_name,
         "last_saved": datetime.now().isoformat(),
-    }
-    for key in PERSISTED_KEYS:
-        if key in st.session_state:
-            state_data[key] = st.session_state[key]
+        "messages_logged": len(messages),
+    }, option=orjson.OPT_INDENT_2)
+    # Splice the already-serialized state into the header object: both end
+    # in "\n}" and the body opens with "{\n"
+    payload = header[:-2] + b",\n" + body[2:] if persisted else header
 
     state_file = project_dir / "state.json"
-    temp_file = project_dir / "state.json.tmp"
-    with open(temp_file, "w") as f:
-        json.dump(state_data, f, indent=2, default=str)
-    temp_file.rename(state_file)
+    _atomic_write(state_file, payload)
+    st.session_state.last_saved_digest = digest
     logger.info("Project saved to %s", state_file)
 
 
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Replace path with data via a temp file.
+
+    fsync before the rename so a crash can't leave a replaced-but-empty file.
+    """
+    temp_file = path.with_name(path.name + ".tmp")
+    with open(temp_file, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+
+# How many already-logged messages are checked for in-place edits; the app
+# only rewrites the latest user message, which is at most this far back
+_LOG_TAIL_CHECK = 2
+
+
+def _sync_messages_log(project_dir: Path, messages: list) -> None:
+    """Bring messages.jsonl in line with messages.
+
+    Messages added since the last sync are appended. If one of the last
+    logged messages changed (the app replaces the latest user message's
+    content after a turn, caught by identity), the file is truncated at that
+    message's byte offset and the rest re-appended. The whole log is only
+    rewritten when it is missing, belongs to another project, or shrank.
+    """
+    log_file = project_dir / MESSAGES_LOG
+    logged = st.session_state.get("messages_log")
+    if (
+        not logged
+        or logged["dir"] != str(project_dir)
+        or len(messages) < len(logged["contents"])
+        or not log_file.exists()
+    ):
+        lines = [orjson.dumps(m) + b"\n" for m in messages]
+        _atomic_write(log_file, b"".join(lines))
+        st.session_state.messages_log = {
+            "dir": str(project_dir),
+            "contents": [m["content"] for m in messages],
+            "offsets": _line_offsets(lines),
+        }
+        return
+
+    contents, offsets = logged["contents"], logged["offsets"]
+    start = len(contents)
+    for i in range(max(0, start - _LOG_TAIL_CHECK), start):
+        if messages[i]["content"] is not contents[i]:
+            start = i
+            break
+    if start == len(messages):
+        return
+
+    lines = [orjson.dumps(m) + b"\n" for m in messages[start:]]
+    with open(log_file, "r+b") as f:
+        f.truncate(offsets[start])
+        f.seek(offsets[start])
+        f.write(b"".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+    del contents[start:]
+    contents.extend(m["content"] for m in messages[start:])
+    offsets[start + 1:] = _line_offsets(lines, offsets[start])[1:]
+
+
+def _line_offsets(lines: list[bytes], base: int = 0) -> list[int]:
+    """Start offset of each line, plus the end offset of the last one."""
+    offsets = [base]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def _read_messages_log(log_file: Path) -> tuple[list, list[int], bool]:
+    """Messages from messages.jsonl, their line offsets, and whether every line was readable.
+
+    A crash mid-append can leave a torn final line. Reading stops there, and
+    the caller leaves messages_log unset so the next save rewrites the file.
+    """
+    messages = []
+    *lines, rest = log_file.read_bytes().split(b"\n")
+    for line in lines:
+        try:
+            messages.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            break
+    else:
+        if not rest:
+            return messages, _line_offsets([line + b"\n" for line in lines]), True
+    # An unterminated last line is torn even if it happens to parse
+    logger.warning("Dropping unreadable tail of %s", log_file)
+    return messages, [], False
+
+
 def load_project(project_dir: Path) -> None:
     """Load project state, merging with current defaults for forward compatibility."""
     state_file = project_dir / "state.json"
     if not state_file.exists():
         return
 
-    with open(state_file, "r") as f:
-        saved_data = json.load(f)
+    saved_data = orjson.loads(state_file.read_bytes())
 
     # Check schema version
     saved_version = saved_data.get("schema_version", "unknown")
@@ -118,6 +248,29 @@ def load_project(project_dir: Path) -> None:
             else:
                 st.session_state[key] = saved_data[key]
 
+    # Projects saved before artifact kinds were tracked: derive it once here
+    if st.session_state.latest_artifact and not st.session_state.latest_artifact_kind:
+        if st.session_state.latest_artifact.startswith("# Solution Evaluation"):
+            st.session_state.latest_artifact_kind = "solution_evaluation_brief"
+        else:
+            st.session_state.latest_artifact_kind = "problem_brief"
+
+    # Projects saved before the messages log keep messages in state.json
+    log_file = project_dir / MESSAGES_LOG
+    if log_file.exists():
+        messages, offsets, intact = _read_messages_log(log_file)
+        # Messages logged after the last state.json write belong to a save
+        # that never finished; drop them so messages match the rest of state
+        logged = saved_data.get("messages_logged", len(messages))
+        if len(messages) > logged:
+            messages, intact = messages[:logged], False
+        st.session_state.messages = messages
+        st.session_state.messages_log = {
+            "dir": str(project_dir),
+            "contents": [m["content"] for m in messages],
+            "offsets": offsets,
+        } if intact else None
+
     # Store metadata
     st.session_state.project_name = saved_data.get("project_name", "Untitled")
     st.session_state.project_dir = project_dir
@@ -128,16 +281,27 @@ def load_project(project_dir: Path) -> None:
 
 
 def _load_context_file(project_dir: Path) -> None:
-    """Read context.md from disk and inject into org_context.internal_context."""
+    """Read context.md from disk and inject into org_context.internal_context.
+
+    Called every turn to pick up manual edits, so the read is skipped while
+    the file's (mtime, size) matches the last read.
+    """
     context_file = project_dir / "context.md"
-    if context_file.exists():
-        content = context_file.read_text().strip()
-        if content:
-            st.session_state.org_context["internal_context"] = content
+    version = _file_version(context_file)
+    if version is None or st.session_state.get("context_file_version") == version:
+        return
+    content = context_file.read_text().strip()
+    if content:
+        st.session_state.org_context["internal_context"] = content
+    st.session_state.context_file_version = version
 
 
 def _write_context_file(project_dir: Path) -> None:
-    """Write current org context to context.md."""
+    """Write current org context to context.md.
+
+    Skipped when the content matches the last write and the file's
+    (mtime, size) shows it hasn't been touched since.
+    """
     ctx = st.session_state.org_context
     parts = []
     if ctx["company"]:
@@ -147,23 +311,35 @@ def _write_context_file(project_dir: Path) -> None:
     if ctx["internal_context"]:
         parts.append(f"## Internal Context\n{ctx['internal_context']}\n")
 
+    content = "\n".join(parts)
     context_file = project_dir / "context.md"
-    context_file.write_text("\n".join(parts))
+    written = st.session_state.get("context_file_written")
+    if written and written[0] == content and written[1] == _file_version(context_file):
+        return
+    context_file.write_text(content)
+    st.session_state.context_file_written = (content, _file_version(context_file))
+
+
+def _file_version(path: Path) -> tuple | None:
+    """(path, mtime_ns, size) as a cheap change detector; None if missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
 
 
 def save_project_state(project_dir: Path, project_state: dict) -> None:
     """Save project_state.json (file summaries + org context)."""
-    state_file = project_dir / "project_state.json"
-    temp_file = project_dir / "project_state.json.tmp"
-    with open(temp_file, "w") as f:
-        json.dump(project_state, f, indent=2)
-    temp_file.rename(state_file)
+    _atomic_write(
+        project_dir / "project_state.json",
+        orjson.dumps(project_state, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+    )
 
 
 def load_project_state(project_dir: Path) -> dict:
     """Load project_state.json, return default if doesn't exist."""
     state_file = project_dir / "project_state.json"
     if state_file.exists():
-        with open(state_file) as f:
-            return json.load(f)
+        return orjson.loads(state_file.read_bytes())
     return {"file_summaries": [], "org_context": ""}
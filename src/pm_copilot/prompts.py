@@ -126,8 +126,9 @@ Turn count: {turn_count}
 ## Routing Decision
 {phase_a_output}
 
-## Full Conversation History
-{full_messages}
+## Latest User Message
+(Earlier turns are in the conversation above.)
+{latest_message}
 
 ## OrgContext
 {org_context}
@@ -182,8 +183,9 @@ First turn in current mode: {is_first_mode_turn}
 ## Routing Decision
 {phase_a_output}
 
-## Full Conversation History
-{full_messages}
+## Latest User Message
+(Earlier turns are in the conversation above.)
+{latest_message}
 
 ## Current Assumption Register
 {full_assumptions}
@@ -279,8 +281,9 @@ First turn in current mode: {is_first_mode_turn}
 ## Routing Decision
 {phase_a_output}
 
-## Full Conversation History
-{full_messages}
+## Latest User Message
+(Earlier turns are in the conversation above.)
+{latest_message}
 
 ## Current Assumption Register
 {full_assumptions}
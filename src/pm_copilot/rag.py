@@ -1,7 +1,13 @@
 """RAG module — embedding, vector storage, retrieval for Forge projects."""
 
+import atexit
 import json
 import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import chromadb
@@ -10,12 +16,64 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from voyageai.error import RateLimitError, ServerError
 
 from . import config
-from .chunking import process_file
+from .chunking import process_file, process_files
 from .mode1_knowledge import MODE1_PROBES, MODE1_PATTERNS
 from .mode2_knowledge import MODE2_PROBES, MODE2_PATTERNS
 
 logger = logging.getLogger("forge.rag")
 
+# Merged Mode 1 + Mode 2 lookup tables, so each Phase A name costs one dict
+# lookup. Probe and pattern names don't overlap across modes. Keys are
+# interned so names interned off Phase A JSON match on identity.
+_PROBES = {sys.intern(k): v for k, v in {**MODE1_PROBES, **MODE2_PROBES}.items()}
+_PATTERNS = {sys.intern(k): v for k, v in {**MODE1_PATTERNS, **MODE2_PATTERNS}.items()}
+
+_NAME_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize_name(name: str) -> str:
+    """Casefold and collapse punctuation/whitespace runs to single spaces."""
+    return _NAME_NORMALIZE_RE.sub(" ", name.casefold()).strip()
+
+
+def _build_aliases(table: dict[str, str]) -> dict[str, str]:
+    """Map normalized keys and heading titles to canonical keys.
+
+    Lets near-miss names from Phase A ("value risk", "Build vs. Buy vs.
+    Partner", "The Dual-Customer Ambiguity") resolve without a retry.
+    """
+    aliases: dict[str, str] = {}
+    for key in table:
+        aliases[_normalize_name(key)] = key
+    for key, body in table.items():
+        # "### Probe 6: Build vs. Buy vs. Partner" → "build vs buy vs partner"
+        title = body.split("\n", 1)[0].partition(": ")[2].split(" (")[0]
+        alias = _normalize_name(title)
+        aliases.setdefault(alias, key)
+        aliases.setdefault(alias.removeprefix("the "), key)
+    return aliases
+
+
+_PROBE_ALIASES = _build_aliases(_PROBES)
+_PATTERN_ALIASES = _build_aliases(_PATTERNS)
+
+
+def _resolve_name(name: str, table: dict[str, str], aliases: dict[str, str]) -> str | None:
+    """Canonical key for a Phase A name — exact match first, then aliases."""
+    if name in table:
+        return name
+    return aliases.get(_normalize_name(name))
+
+
+# Runs assemble_context's conversation query alongside its document query when
+# the caller didn't prefetch conversations; shared so calls don't start threads
+_conversation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forge-conversations")
+
+
+# Canonical pattern order (knowledge-base order), so the triggered-pattern
+# section is byte-identical however Phase A happens to order its list
+_PATTERN_ORDER = {name: i for i, name in enumerate(_PATTERNS)}
+
 
 # ---------------------------------------------------------------------------
 # Module-level factory functions — wrapped with @st.cache_resource in app.py
@@ -35,6 +93,22 @@ def _create_voyage_client(api_key: str) -> voyageai.Client:
 # Helpers
 # ---------------------------------------------------------------------------
 
+# ForgeRAG instances holding queued turns, flushed at interpreter exit
+_RAGS_WITH_PENDING_TURNS: set["ForgeRAG"] = set()
+
+
+@atexit.register
+def flush_pending_turns(project_dir: Path | None = None) -> None:
+    """Index queued turns now, for every ForgeRAG or only those for project_dir."""
+    for rag in list(_RAGS_WITH_PENDING_TURNS):
+        if project_dir is not None and rag.project_dir != project_dir:
+            continue
+        try:
+            rag.flush_turns()
+        except Exception as e:
+            logger.warning("Flushing queued turns failed: %s", e)
+
+
 def format_context_block(project_state: dict) -> str:
     """Format project state into a text block for prompt injection."""
     parts = []
@@ -73,6 +147,8 @@ class ForgeRAG:
         self.client = chroma_client
         self.voyage = voyage_client
         self.enabled = voyage_client is not None
+        self._pending_turns: list[dict] = []  # queue_turn() buffer
+        self._pending_lock = threading.Lock()
 
         # Get or create collections
         self.documents = self.client.get_or_create_collection(
@@ -89,6 +165,31 @@ class ForgeRAG:
         else:
             logger.info("ForgeRAG initialized for %s", project_dir)
 
+        # A reopened project gets a new instance; turns the old one still
+        # holds would otherwise never be retrievable from this one
+        flush_pending_turns(project_dir)
+
+    def warm_up(self) -> None:
+        """Run one throwaway query per non-empty collection.
+
+        The first query after a process start pays for loading the HNSW
+        index; callers run this in a background thread right after init so
+        the user's first turn doesn't. Never raises.
+        """
+        for collection in (self.documents, self.conversations):
+            try:
+                start = time.perf_counter()
+                sample = collection.get(limit=1, include=["embeddings"])
+                if not sample["ids"]:
+                    continue
+                collection.query(query_embeddings=[sample["embeddings"][0]], n_results=1)
+                logger.info(
+                    "Chroma warmup (%s): %dms",
+                    collection.name, (time.perf_counter() - start) * 1000,
+                )
+            except Exception as e:
+                logger.warning("Chroma warmup failed: %s", e)
+
     # -------------------------------------------------------------------
     # Embedding
     # -------------------------------------------------------------------
@@ -125,25 +226,14 @@ class ForgeRAG:
     # Document ingestion
     # -------------------------------------------------------------------
 
-    def ingest_file(self, file_path: Path, file_summary: str) -> int:
-        """Ingest a file into the documents collection.
-
-        Returns number of chunks stored.
-        """
-        chunks = process_file(file_path)
-        if not chunks:
-            logger.warning("No chunks produced from %s", file_path.name)
-            return 0
-
-        source_filename = file_path.name
+    @staticmethod
+    def _prepare_chunks(
+        source_filename: str, chunks: list[dict]
+    ) -> tuple[list[str], list[str], list[dict]]:
+        """Turn a file's leaf chunks into (ids, texts, metadatas) ready for embedding."""
 
         # Prepare texts for embedding (context header + chunk text)
         texts = [f"{c['context_header']}\n{c['text']}" for c in chunks]
-
-        # Embed
-        embeddings = self._embed(texts)
-
-        # Build ChromaDB add arguments
         ids = [f"{source_filename}_chunk_{i}" for i in range(len(chunks))]
         metadatas = [
             {
@@ -156,16 +246,71 @@ class ForgeRAG:
             }
             for c in chunks
         ]
+        return ids, texts, metadatas
 
-        self.documents.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-        )
+    def _add_documents(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        texts: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        """Add records to the documents collection in sub-batches."""
+        step = config.CHROMA_ADD_BATCH_SIZE
+        for i in range(0, len(ids), step):
+            self.documents.add(
+                ids=ids[i : i + step],
+                embeddings=embeddings[i : i + step],
+                documents=texts[i : i + step],
+                metadatas=metadatas[i : i + step],
+            )
+
+    def ingest_file(self, file_path: Path, file_summary: str) -> int:
+        """Ingest a file into the documents collection.
+
+        Returns number of chunks stored.
+        """
+        ids, texts, metadatas = self._prepare_chunks(file_path.name, process_file(file_path))
+        if not ids:
+            logger.warning("No chunks produced from %s", file_path.name)
+            return 0
+
+        embeddings = self._embed(texts)
+        self._add_documents(ids, embeddings, texts, metadatas)
+
+        logger.info("Ingested %s: %d chunks", file_path.name, len(ids))
+        return len(ids)
+
+    def ingest_files_bulk(
+        self, files: list[tuple[Path, str]], markdown: dict[str, str] | None = None
+    ) -> dict[str, int]:
+        """Ingest several files with one embedding pass and batched adds.
 
-        logger.info("Ingested %s: %d chunks", source_filename, len(chunks))
-        return len(chunks)
+        Takes (file_path, file_summary) pairs, plus {filename: markdown} for
+        files the caller already converted. Returns {filename: chunk_count}.
+        """
+        chunks_by_file = process_files([file_path for file_path, _ in files], markdown)
+        counts: dict[str, int] = {}
+        all_ids: list[str] = []
+        all_texts: list[str] = []
+        all_metadatas: list[dict] = []
+        for file_path, _summary in files:
+            ids, texts, metadatas = self._prepare_chunks(
+                file_path.name, chunks_by_file[file_path.name]
+            )
+            if not ids:
+                logger.warning("No chunks produced from %s", file_path.name)
+            counts[file_path.name] = len(ids)
+            all_ids.extend(ids)
+            all_texts.extend(texts)
+            all_metadatas.extend(metadatas)
+
+        if all_ids:
+            embeddings = self._embed(all_texts)
+            self._add_documents(all_ids, embeddings, all_texts, all_metadatas)
+
+        logger.info("Bulk ingested %d files: %d chunks", len(files), len(all_ids))
+        return counts
 
     def remove_file(self, filename: str) -> int:
         """Remove all chunks for a given filename from documents collection."""
@@ -194,24 +339,61 @@ class ForgeRAG:
         active_mode: str,
     ) -> None:
         """Index a completed conversation turn."""
-        embedding = self._embed([turn_summary])[0]
+        self.index_turns([{
+            "turn_number": turn_number,
+            "user_message": user_message,
+            "assistant_response": assistant_response,
+            "turn_summary": turn_summary,
+            "active_probe": active_probe,
+            "active_mode": active_mode,
+        }])
+
+    def index_turns(self, turns: list[dict]) -> None:
+        """Index completed turns (index_turn() kwargs) with one embed + upsert."""
+        if not turns:
+            return
+        summaries = [t["turn_summary"] for t in turns]
+        embeddings = self._embed(summaries)
 
         self.conversations.upsert(
-            ids=[f"turn_{turn_number}"],
-            embeddings=[embedding],
-            documents=[turn_summary],
+            ids=[f"turn_{t['turn_number']}" for t in turns],
+            embeddings=embeddings,
+            documents=summaries,
             metadatas=[
                 {
-                    "turn_number": turn_number,
-                    "active_probe": active_probe or "",
-                    "active_mode": active_mode or "",
-                    "user_message": user_message,
-                    "assistant_response": assistant_response,
+                    "turn_number": t["turn_number"],
+                    "active_probe": t["active_probe"] or "",
+                    "active_mode": t["active_mode"] or "",
+                    "user_message": t["user_message"],
+                    "assistant_response": t["assistant_response"],
                 }
+                for t in turns
             ],
         )
 
-        logger.info("Indexed turn %d", turn_number)
+        logger.info("Indexed turns %s", ", ".join(str(t["turn_number"]) for t in turns))
+
+    def queue_turn(self, **turn) -> None:
+        """Buffer a turn for batched indexing (same kwargs as index_turn()).
+
+        Flushes once ALWAYS_ON_TURN_WINDOW turns are pending — retrieval only
+        reaches turns older than that window, so every turn is indexed before
+        it can be retrieved. Anything left is flushed when the project is
+        switched or reopened, or at process exit.
+        """
+        with self._pending_lock:
+            self._pending_turns.append(turn)
+            _RAGS_WITH_PENDING_TURNS.add(self)
+            ready = len(self._pending_turns) >= config.ALWAYS_ON_TURN_WINDOW
+        if ready:
+            self.flush_turns()
+
+    def flush_turns(self) -> None:
+        """Index all buffered turns now."""
+        with self._pending_lock:
+            turns, self._pending_turns = self._pending_turns, []
+            _RAGS_WITH_PENDING_TURNS.discard(self)
+        self.index_turns(turns)
 
     # -------------------------------------------------------------------
     # Retrieval
@@ -355,10 +537,8 @@ class ForgeRAG:
         Returns (probe_content, pattern_content) — both plain strings.
         """
         probe_name = phase_a_decision.get("next_probe", "")
-        probe_content = (
-            MODE1_PROBES.get(probe_name, "")
-            or MODE2_PROBES.get(probe_name, "")
-        )
+        probe_key = _resolve_name(probe_name, _PROBES, _PROBE_ALIASES) if probe_name else None
+        probe_content = _PROBES[probe_key] if probe_key else ""
         if probe_name and not probe_content:
             logger.warning(
                 "Probe lookup miss: '%s' not in MODE1_PROBES %s or MODE2_PROBES %s",
@@ -368,16 +548,19 @@ class ForgeRAG:
             )
 
         triggered = phase_a_decision.get("triggered_patterns", [])
-        pattern_parts = []
+        known = []
         for p in triggered:
-            content = MODE1_PATTERNS.get(p, "") or MODE2_PATTERNS.get(p, "")
-            if content:
-                pattern_parts.append(content)
+            key = _resolve_name(p, _PATTERNS, _PATTERN_ALIASES)
+            if key:
+                known.append(key)
             else:
                 logger.warning(
                     "Pattern lookup miss: '%s' not in MODE1_PATTERNS or MODE2_PATTERNS",
                     p,
                 )
+        pattern_parts = [
+            _PATTERNS[p] for p in sorted(set(known), key=_PATTERN_ORDER.__getitem__)
+        ]
         pattern_content = "\n\n".join(pattern_parts)
 
         return probe_content, pattern_content
@@ -407,17 +590,29 @@ class ForgeRAG:
             )
         return "\n\n".join(parts)
 
+    def prefetch_conversations(self, user_message: str, current_turn: int) -> str:
+        """Retrieve and format older conversation turns for a user message.
+
+        Depends only on the user message (not on Phase A), so the orchestrator
+        runs it in a worker thread alongside the routing call. Touches no
+        Streamlit session state.
+        """
+        conv_results = self.retrieve_conversations(user_message, current_turn)
+        return self._format_retrieved_conversations(conv_results)
+
     def assemble_context(
         self,
         user_message: str,
         phase_a_decision: dict,
         current_turn: int,
         project_state: dict,
+        retrieved_conversations: str | None = None,
     ) -> dict:
         """Assemble the full context for Phase B.
 
         Performs dictionary lookups for probe/pattern content and
         semantic retrieval from ChromaDB for documents and conversations.
+        Pass retrieved_conversations to reuse a prefetch_conversations() result.
 
         Returns dict with assembled context sections ready for prompt injection.
         """
@@ -429,7 +624,15 @@ class ForgeRAG:
             phase_a_decision
         )
 
-        # 3. Retrieve document chunks from ChromaDB
+        # 3. Retrieve conversation turns from ChromaDB (unless prefetched),
+        # in a worker while the document query runs
+        conv_future = None
+        if retrieved_conversations is None:
+            conv_future = _conversation_pool.submit(
+                self.prefetch_conversations, user_message, current_turn
+            )
+
+        # 4. Retrieve document chunks from ChromaDB
         query = user_message
         if probe_content:
             # Append probe context to improve retrieval relevance
@@ -437,13 +640,8 @@ class ForgeRAG:
         doc_results = self.retrieve_documents(query)
         retrieved_documents = self._format_retrieved_documents(doc_results)
 
-        # 4. Retrieve conversation turns from ChromaDB
-        conv_results = self.retrieve_conversations(
-            user_message, current_turn
-        )
-        retrieved_conversations = self._format_retrieved_conversations(
-            conv_results
-        )
+        if conv_future is not None:
+            retrieved_conversations = conv_future.result()
 
         return {
             "context_block": context_block,
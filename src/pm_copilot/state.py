@@ -68,11 +68,21 @@ def init_session_state():
             "enrichment_count": 0,     # How many times we've enriched (cap at 3)
         }
         st.session_state.latest_artifact = None  # Rendered markdown from generate_artifact
+        st.session_state.latest_artifact_kind = None  # artifact_type of latest_artifact ("problem_brief" | "solution_evaluation_brief")
         st.session_state.pending_questions = None  # Questions from latest assistant response for checkbox UI
+        st.session_state.last_user_msg_idx = None  # Index in messages of the latest user turn
         st.session_state.project_name = None
         st.session_state.project_dir = None
         st.session_state.is_priming_turn = False
         st.session_state.rag = None  # ForgeRAG instance (transient, not persisted)
+        st.session_state.context_file_version = None  # context.md (path, mtime_ns, size) at last read
+        st.session_state.context_file_written = None  # (content, version) of our last context.md write
+        st.session_state.last_saved_digest = None  # (project_dir, hash) of the last state.json write
+        st.session_state.messages_log = None  # Project dir, contents and line offsets of messages.jsonl
+        st.session_state.assumption_render_cache = None  # Per-assumption prompt renderings (transient)
+        st.session_state.assumption_register_dirty = set()  # Assumption ids changed since last render
+        st.session_state.skeleton_version = 0  # Bumped by skeleton tools (transient)
+        st.session_state.skeleton_render_cache = None  # _format_skeleton memo (transient)
         st.session_state.project_state = {  # Persisted in project_state.json
             "file_summaries": [],
             "org_context": "",
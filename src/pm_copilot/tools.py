@@ -249,6 +249,46 @@ TOOL_DEFINITIONS = [
 ]
 
 
+def _compile_validator(schema: dict):
+    """Build an input check for a tool schema once — required fields and enums only."""
+    required = tuple(schema.get("required", ()))
+    enums = {
+        field: frozenset(prop["enum"])
+        for field, prop in schema["properties"].items()
+        if "enum" in prop
+    }
+
+    def validate(tool_input: dict) -> str | None:
+        missing = [field for field in required if field not in tool_input]
+        if missing:
+            return f"missing required field(s): {', '.join(missing)}"
+        for field, allowed in enums.items():
+            value = tool_input.get(field)
+            if value is not None and (not isinstance(value, str) or value not in allowed):
+                return f"'{field}' must be one of {sorted(allowed)}, got {value!r}"
+        return None
+
+    return validate
+
+
+# Mode 2 skeleton writers build keys from their inputs, so bad input would
+# corrupt the skeleton or raise mid-turn. Validators are compiled at import.
+_TOOL_VALIDATORS = {
+    tool["name"]: _compile_validator(tool["input_schema"])
+    for tool in TOOL_DEFINITIONS
+    if tool["name"] in ("set_risk_assessment", "set_validation_plan", "set_go_no_go", "set_solution_info")
+}
+
+
+# Tools that write document_skeleton; each call bumps skeleton_version so the
+# orchestrator's memoized skeleton rendering is refreshed.
+_SKELETON_WRITERS = frozenset({
+    "update_problem_statement", "update_target_audience", "add_stakeholder",
+    "update_success_metrics", "add_decision_criteria", "set_risk_assessment",
+    "set_validation_plan", "set_go_no_go", "set_solution_info",
+})
+
+
 def handle_tool_call(tool_name: str, tool_input: dict) -> str:
     """Route a tool call to the appropriate handler. Returns result string."""
     logger.debug("Tool call: %s | input: %.200s", tool_name, str(tool_input))
@@ -274,11 +314,26 @@ def handle_tool_call(tool_name: str, tool_input: dict) -> str:
     }
     handler = handlers.get(tool_name)
     if handler:
-        return handler(tool_input)
+        validate = _TOOL_VALIDATORS.get(tool_name)
+        error = validate(tool_input) if validate else None
+        if error:
+            logger.warning("Rejected %s call: %s", tool_name, error)
+            return f"Invalid input for {tool_name}: {error}"
+        result = handler(tool_input)
+        if tool_name in _SKELETON_WRITERS and "skeleton_version" in st.session_state:
+            st.session_state.skeleton_version += 1
+        return result
     logger.warning("Unknown tool name: %s", tool_name)
     return f"Unknown tool: {tool_name}"
 
 
+def _mark_assumptions_dirty(*aids: str) -> None:
+    """Flag assumptions whose cached prompt rendering is stale."""
+    dirty = st.session_state.get("assumption_register_dirty")
+    if dirty is not None:
+        dirty.update(aids)
+
+
 def _handle_register_assumption(input: dict) -> str:
     st.session_state.assumption_counter += 1
     aid = f"A{st.session_state.assumption_counter}"
@@ -303,6 +358,7 @@ def _handle_register_assumption(input: dict) -> str:
         if dep_id in st.session_state.assumption_register:
             st.session_state.assumption_register[dep_id]["dependents"].append(aid)
     st.session_state.assumption_register[aid] = assumption
+    _mark_assumptions_dirty(aid)
     return f"Registered assumption {aid}: {input['claim']}"
 
 
@@ -313,6 +369,7 @@ def _handle_update_assumption_status(input: dict) -> str:
     assumption = st.session_state.assumption_register[aid]
     assumption["status"] = input["new_status"]
     assumption["last_updated_turn"] = st.session_state.turn_count
+    _mark_assumptions_dirty(aid)
 
     # Dependency cascade
     cascade_results = []
@@ -323,6 +380,7 @@ def _handle_update_assumption_status(input: dict) -> str:
                 dep["status"] = "at_risk"
                 dep["basis"] += f"\n⚠️ Dependency {aid} was invalidated: {input['reason']}"
                 dep["last_updated_turn"] = st.session_state.turn_count
+                _mark_assumptions_dirty(dep_id)
                 cascade_results.append(f"{dep_id} flagged as at_risk")
     elif input["new_status"] == "confirmed":
         for dep_id in assumption.get("dependents", []):
@@ -330,6 +388,7 @@ def _handle_update_assumption_status(input: dict) -> str:
             if dep and dep["confidence"] == "guessed":
                 dep["confidence"] = "informed"
                 dep["last_updated_turn"] = st.session_state.turn_count
+                _mark_assumptions_dirty(dep_id)
                 cascade_results.append(f"{dep_id} confidence upgraded to informed")
 
     result = f"Updated {aid} status to {input['new_status']}: {input['reason']}"
@@ -344,6 +403,7 @@ def _handle_update_assumption_confidence(input: dict) -> str:
         return f"Assumption {aid} not found"
     st.session_state.assumption_register[aid]["confidence"] = input["new_confidence"]
     st.session_state.assumption_register[aid]["last_updated_turn"] = st.session_state.turn_count
+    _mark_assumptions_dirty(aid)
     return f"Updated {aid} confidence to {input['new_confidence']}: {input['reason']}"
 
 
@@ -490,6 +550,7 @@ def _render_problem_brief() -> str:
 {do_not or '_Not yet defined_'}
 """
     st.session_state.latest_artifact = doc
+    st.session_state.latest_artifact_kind = "problem_brief"
     return doc
 
 
@@ -515,24 +576,21 @@ def _render_solution_evaluation_brief() -> str:
 
     # Build risk sections
     def format_risk(dimension_name, display_name):
-        level = skeleton.get(f"{dimension_name}_risk_level")
+        level_key, summary_key, for_key, against_key = _RISK_FIELDS[dimension_name]
+        level = skeleton.get(level_key)
         if not level:
             return f"### {display_name}: _Not assessed_\n"
-        summary = skeleton.get(f"{dimension_name}_risk_summary", "_No summary_")
+        summary = skeleton.get(summary_key, "_No summary_")
         text = f"### {display_name}: {level.upper()}\n{summary}\n"
-        evidence_for = skeleton.get(f"{dimension_name}_risk_evidence_for", [])
-        evidence_against = skeleton.get(f"{dimension_name}_risk_evidence_against", [])
+        evidence_for = skeleton.get(for_key, [])
+        evidence_against = skeleton.get(against_key, [])
         if evidence_for:
             text += "\n**Supporting evidence:**\n" + "\n".join(f"- {e}" for e in evidence_for) + "\n"
         if evidence_against:
             text += "\n**Concerns:**\n" + "\n".join(f"- {e}" for e in evidence_against) + "\n"
         return text
 
-    risk_text = ""
-    risk_text += format_risk("value", "Value Risk")
-    risk_text += format_risk("usability", "Usability Risk")
-    risk_text += format_risk("feasibility", "Feasibility Risk")
-    risk_text += format_risk("viability", "Viability Risk")
+    risk_text = "".join(format_risk(dim, f"{dim.capitalize()} Risk") for dim in _RISK_FIELDS)
 
     # Build assumption table (all active/at_risk)
     assumption_rows = ""
@@ -595,19 +653,28 @@ Evaluated against: {skeleton.get('problem_statement', '_No problem statement fro
 {dealbreakers or '_Not yet defined_'}
 """
     st.session_state.latest_artifact = doc
+    st.session_state.latest_artifact_kind = "solution_evaluation_brief"
     return doc
 
 
+# Skeleton keys per risk dimension: (level, summary, evidence_for, evidence_against)
+_RISK_FIELDS = {
+    d: (f"{d}_risk_level", f"{d}_risk_summary", f"{d}_risk_evidence_for", f"{d}_risk_evidence_against")
+    for d in ("value", "usability", "feasibility", "viability")
+}
+
+
 def _handle_set_risk_assessment(input: dict) -> str:
     """Set risk assessment for one of the four Cagan dimensions."""
     dim = input["dimension"]
+    level_key, summary_key, for_key, against_key = _RISK_FIELDS[dim]
     skeleton = st.session_state.document_skeleton
-    skeleton[f"{dim}_risk_level"] = input["level"]
-    skeleton[f"{dim}_risk_summary"] = input["summary"]
+    skeleton[level_key] = input["level"]
+    skeleton[summary_key] = input["summary"]
     if "evidence_for" in input:
-        skeleton[f"{dim}_risk_evidence_for"] = input["evidence_for"]
+        skeleton[for_key] = input["evidence_for"]
     if "evidence_against" in input:
-        skeleton[f"{dim}_risk_evidence_against"] = input["evidence_against"]
+        skeleton[against_key] = input["evidence_against"]
     return f"Set {dim} risk: {input['level']} — {input['summary']}"
 
 
@@ -641,9 +708,23 @@ def _handle_set_solution_info(input: dict) -> str:
     return f"Solution info set: {input['solution_name']}"
 
 
+def _record_fired(key: str, entry: dict) -> None:
+    """Add entry to routing_context[key], replacing any earlier entry of the same name.
+
+    "count" carries over so re-fires are tallied (entries saved before it
+    existed count as one).
+    """
+    fired = st.session_state.routing_context[key]
+    for i, existing in enumerate(fired):
+        if existing["name"] == entry["name"]:
+            fired[i] = {**entry, "count": existing.get("count", 1) + 1}
+            return
+    fired.append({**entry, "count": 1})
+
+
 def _handle_record_pattern_fired(input: dict) -> str:
     """Record that a domain pattern triggered."""
-    st.session_state.routing_context["patterns_fired"].append({
+    _record_fired("patterns_fired", {
         "name": input["pattern_name"],
         "reason": input["trigger_reason"],
         "turn": st.session_state.turn_count,
@@ -653,7 +734,7 @@ def _handle_record_pattern_fired(input: dict) -> str:
 
 def _handle_record_probe_fired(input: dict) -> str:
     """Record that a probe was executed."""
-    st.session_state.routing_context["probes_fired"].append({
+    _record_fired("probes_fired", {
         "name": input["probe_name"],
         "summary": input.get("summary", ""),
         "turn": st.session_state.turn_count,
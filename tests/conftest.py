@@ -94,11 +94,17 @@ def _fresh_session_state(**overrides) -> MockSessionState:
             "enrichment_count": 0,
         },
         latest_artifact=None,
+        latest_artifact_kind=None,
         pending_questions=None,
+        last_user_msg_idx=None,
         project_name=None,
         project_dir=None,
         is_priming_turn=False,
         rag=None,
+        assumption_render_cache=None,
+        assumption_register_dirty=set(),
+        skeleton_version=0,
+        skeleton_render_cache=None,
         project_state={
             "file_summaries": [],
             "org_context": "",
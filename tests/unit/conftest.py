@@ -159,3 +159,23 @@ def mock_session_state_for_orchestrator(mock_session_state):
     mock_st.cache_resource = lambda f: f  # passthrough decorator
     with patch("pm_copilot.orchestrator.st", mock_st):
         yield mock_session_state
+
+
+# ---------------------------------------------------------------------------
+# Session state fixture with st patching for persistence.py
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def mock_session_state_for_persistence(mock_session_state):
+    """MockSessionState patched into persistence, state and tools.
+
+    state.init_session_state runs inside load_project and tools writes the
+    data a save picks up, so all three share the one session state.
+    """
+    mock_st = MagicMock()
+    mock_st.session_state = mock_session_state
+    with patch("pm_copilot.persistence.st", mock_st), \
+         patch("pm_copilot.state.st", mock_st), \
+         patch("pm_copilot.tools.st", mock_st):
+        yield mock_session_state
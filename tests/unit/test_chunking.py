@@ -9,19 +9,35 @@ import pytest
 
 from pm_copilot.chunking import (
     FileConversionError,
+    _get_converter,
     _estimate_tokens,
-    _group_segments,
+    _group_spans,
+    _may_exceed,
+    _process_file_cached,
     _split_large_chunk,
+    _split_parent_group,
+    _token_ceiling,
     convert_to_markdown,
     create_parent_child_pairs,
     enforce_chunk_sizes,
     process_file,
+    process_files,
     split_markdown_by_headers,
 )
 
 FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
 
 
+@pytest.fixture(autouse=True)
+def _reset_converter():
+    """Tests swap in their own markitdown module, so drop the cached converter and results."""
+    _get_converter.cache_clear()
+    _process_file_cached.cache_clear()
+    yield
+    _get_converter.cache_clear()
+    _process_file_cached.cache_clear()
+
+
 # ===================================================================
 # _estimate_tokens
 # ===================================================================
@@ -65,6 +81,18 @@ class TestConvertToMarkdown:
             result = convert_to_markdown(docx_file)
         assert result == "# Converted\nContent"
 
+    def test_docx_converter_reused(self, tmp_path):
+        docx_file = tmp_path / "test.docx"
+        docx_file.write_bytes(b"fake docx content")
+        mock_mid = MagicMock()
+        mock_mid.MarkItDown.return_value.convert.return_value = SimpleNamespace(
+            text_content="text"
+        )
+        with patch.dict("sys.modules", {"markitdown": mock_mid}):
+            convert_to_markdown(docx_file)
+            convert_to_markdown(docx_file)
+        mock_mid.MarkItDown.assert_called_once()
+
     def test_unsupported_extension(self, tmp_path):
         txt_file = tmp_path / "test.txt"
         txt_file.write_text("hello")
@@ -138,6 +166,26 @@ class TestSplitMarkdownByHeaders:
         # E's path: A > D > E (B was popped)
         assert chunks[4]["header_path"] == ["A", "D", "E"]
 
+    def test_skipped_levels_clear_deeper_titles(self):
+        text = "# A\n### C\nx\n## B\ny"
+        chunks = split_markdown_by_headers(text, "skip.md")
+        assert [c["header_path"] for c in chunks] == [["A"], ["A", "C"], ["A", "B"]]
+
+    def test_header_after_leading_newline(self):
+        chunks = split_markdown_by_headers("\n# A\nx\n#\n# B\ny", "lead.md")
+        assert [c["header_path"] for c in chunks] == [["A"], ["B"]]
+
+    def test_bare_hash_line_not_a_header(self):
+        text = "#\nNot a title\n\n# Real\nBody"
+        chunks = split_markdown_by_headers(text, "bare.md")
+        assert [c["header_path"] for c in chunks] == [["Introduction"], ["Real"]]
+
+    def test_blank_title_header_needs_two_trailing_chars(self):
+        text = "Intro\n#  \nUnder blank\n# \nStill under blank\n# Real\nBody"
+        chunks = split_markdown_by_headers(text, "blank.md")
+        assert [c["header_path"] for c in chunks] == [["Introduction"], [""], ["Real"]]
+        assert "Still under blank" in chunks[1]["text"]
+
     def test_sample_fixture_file(self):
         text = (FIXTURES_DIR / "sample_document.md").read_text()
         chunks = split_markdown_by_headers(text, "sample_document.md")
@@ -176,6 +224,19 @@ class TestEnforceChunkSizes:
         result = enforce_chunk_sizes([chunk], max_tokens=100)
         assert len(result) > 1
 
+    def test_split_at_question_and_exclamation_marks(self):
+        text = "Why is this slow? " * 40 + "It is fine! " * 40
+        result = enforce_chunk_sizes([self._make_chunk(text.strip())], min_tokens=0, max_tokens=100)
+        assert len(result) > 1
+        assert all(r["text"][-1] in "?!" for r in result)
+
+    def test_oversized_sentence_falls_back_to_words(self):
+        text = " ".join(["word"] * 300)
+        result = enforce_chunk_sizes([self._make_chunk(text)], min_tokens=0, max_tokens=100)
+        assert len(result) > 1
+        assert all(r["token_count"] <= 100 for r in result)
+        assert " ".join(r["text"] for r in result) == text
+
     def test_small_merged_at_same_level(self):
         c1 = self._make_chunk("tiny", level=1)
         c2 = self._make_chunk("also tiny", level=1)
@@ -184,6 +245,12 @@ class TestEnforceChunkSizes:
         assert "tiny" in result[0]["text"]
         assert "also tiny" in result[0]["text"]
 
+    def test_merged_token_count_is_summed(self):
+        c1 = self._make_chunk("one two three", level=1)
+        c2 = self._make_chunk("four five", level=1)
+        result = enforce_chunk_sizes([c1, c2], min_tokens=50)
+        assert result[0]["token_count"] == _estimate_tokens("one two three") + _estimate_tokens("four five")
+
     def test_small_not_merged_at_different_levels(self):
         c1 = self._make_chunk("tiny", level=1)
         c2 = self._make_chunk("also tiny", level=2)
@@ -197,10 +264,33 @@ class TestEnforceChunkSizes:
         assert len(result) == 1
         assert result[0]["text"] == text
 
+    def test_short_chunk_skips_word_count(self):
+        chunk = self._make_chunk("short text")
+        with patch("pm_copilot.chunking._estimate_tokens") as mock_est:
+            assert not _may_exceed(chunk, max_tokens=500)
+        mock_est.assert_not_called()
+
+    def test_ceiling_never_below_estimate(self):
+        for text in ["a", "a b", "a  b", "word " * 40, "x" * 99]:
+            chunk = self._make_chunk(text)
+            assert _token_ceiling(chunk) >= _estimate_tokens(text)
+
     def test_empty_input(self):
         result = enforce_chunk_sizes([])
         assert result == []
 
+    def test_split_sub_chunks_are_slices_with_token_counts(self):
+        text = " ".join(["alpha"] * 200) + "\n\n" + " ".join(["beta"] * 200)
+        result = _split_large_chunk(self._make_chunk(text), max_tokens=300)
+        assert [r["text"] for r in result] == text.split("\n\n")
+        assert all(r["token_count"] == _estimate_tokens(r["text"]) for r in result)
+
+    def test_group_spans_respects_max_tokens(self):
+        text = "one two. three four. five six"
+        spans = [(0, 9), (9, 21), (21, len(text))]
+        groups = _group_spans(text, spans, max_tokens=5)
+        assert groups == [(0, 21, 4), (21, len(text), 2)]
+
     def test_split_preserves_metadata(self):
         text = " ".join(["word"] * 400) + "\n\n" + " ".join(["word"] * 400)
         chunk = self._make_chunk(text, level=2, header_path=["A", "B"])
@@ -254,12 +344,32 @@ class TestCreateParentChildPairs:
         parent_ids = set(r["parent_id"] for r in result)
         assert len(parent_ids) > 1
 
+    def test_split_parent_group_fills_greedily(self):
+        chunks = [
+            {**self._make_chunk(t, ["Big"]), "token_count": n}
+            for t, n in [("a", 3), ("b", 3), ("c", 0), ("d", 5), ("e", 9)]
+        ]
+        groups = _split_parent_group(chunks, max_tokens=6)
+        assert [[c["text"] for c in g] for g in groups] == [["a", "b", "c"], ["d"], ["e"]]
+
     def test_deterministic_parent_id(self):
         c = self._make_chunk("deterministic text", ["H1"])
         result = create_parent_child_pairs([c])
-        expected = hashlib.md5("deterministic text".encode()).hexdigest()[:12]
+        expected = hashlib.blake2b("deterministic text".encode(), digest_size=6).hexdigest()
+        assert result[0]["parent_id"] == expected
+
+    def test_parent_id_matches_hash_of_parent_text(self):
+        c1 = self._make_chunk("first", ["H1"])
+        c2 = self._make_chunk("second", ["H1"])
+        result = create_parent_child_pairs([c1, c2])
+        expected = hashlib.blake2b(result[0]["parent_text"].encode(), digest_size=6).hexdigest()
         assert result[0]["parent_id"] == expected
 
+    def test_leaves_augmented_in_place(self):
+        chunks = [self._make_chunk("first", ["H1"]), self._make_chunk("second", ["H1"])]
+        result = create_parent_child_pairs(chunks)
+        assert all(r is c for r, c in zip(result, chunks))
+
     def test_leaf_index_ordering(self):
         c1 = self._make_chunk("first", ["H1"])
         c2 = self._make_chunk("second", ["H1"])
@@ -308,9 +418,82 @@ class TestProcessFile:
         with pytest.raises(FileConversionError):
             process_file(bad_file)
 
+    def test_unchanged_file_reuses_result(self, tmp_path):
+        md = tmp_path / "cached.md"
+        md.write_text("# Title\nBody.")
+        with patch("pm_copilot.chunking.convert_to_markdown", wraps=convert_to_markdown) as mock_convert:
+            first = process_file(md)
+            second = process_file(md)
+        assert first == second
+        mock_convert.assert_called_once()
+
+    def test_caller_edits_do_not_reach_the_cache(self, tmp_path):
+        md = tmp_path / "cached.md"
+        md.write_text("# Title\nBody.")
+        process_file(md)[0]["text"] = "overwritten"
+        assert process_file(md)[0]["text"] != "overwritten"
+
+    def test_modified_file_is_reprocessed(self, tmp_path):
+        md = tmp_path / "changed.md"
+        md.write_text("# Old\nBody.")
+        assert process_file(md)[0]["header_path"] == ["Old"]
+        md.write_text("# Newer title\nBody.")
+        assert process_file(md)[0]["header_path"] == ["Newer title"]
+
     def test_md_with_no_headers(self, tmp_path):
         md = tmp_path / "flat.md"
         md.write_text("Just a paragraph of text.\n\nAnother paragraph.")
         result = process_file(md)
         assert len(result) >= 1
         assert result[0]["header_path"] == ["Introduction"]
+
+
+# ===================================================================
+# process_files (parallel pipeline)
+# ===================================================================
+
+
+class TestProcessFiles:
+    def test_matches_sequential_results(self, tmp_path):
+        paths = []
+        for i in range(3):
+            md = tmp_path / f"doc{i}.md"
+            md.write_text(f"# Section {i}\nBody text for document {i}.\n\n## Sub\nMore.")
+            paths.append(md)
+        with patch("pm_copilot.chunking._POOL_MIN_BYTES", 0):
+            result = process_files(paths)
+        assert list(result) == ["doc0.md", "doc1.md", "doc2.md"]
+        for md in paths:
+            # token_count is a lazily filled cache, so compare the chunk content
+            expected = process_file(md)
+            assert [(c["text"], c["parent_id"]) for c in result[md.name]] == [
+                (c["text"], c["parent_id"]) for c in expected
+            ]
+
+    def test_single_file_runs_in_process(self):
+        path = FIXTURES_DIR / "sample_document.md"
+        with patch("pm_copilot.chunking.ProcessPoolExecutor") as mock_pool:
+            result = process_files([path])
+        mock_pool.assert_not_called()
+        assert result == {path.name: process_file(path)}
+
+    def test_empty_input(self):
+        assert process_files([]) == {}
+
+    def test_small_batch_runs_in_process(self, tmp_path):
+        paths = []
+        for i in range(3):
+            md = tmp_path / f"doc{i}.md"
+            md.write_text(f"# Section {i}\nBody.")
+            paths.append(md)
+        with patch("pm_copilot.chunking._get_pool") as mock_pool:
+            result = process_files(paths)
+        mock_pool.assert_not_called()
+        assert list(result) == ["doc0.md", "doc1.md", "doc2.md"]
+
+    def test_given_markdown_is_not_converted_again(self, tmp_path):
+        path = tmp_path / "report.docx"
+        with patch("pm_copilot.chunking.convert_to_markdown") as mock_convert:
+            result = process_files([path], {"report.docx": "# Findings\nChurn is up."})
+        mock_convert.assert_not_called()
+        assert result["report.docx"][0]["header_path"] == ["Findings"]
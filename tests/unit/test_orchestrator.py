@@ -24,7 +24,7 @@ from tests.unit.conftest import _make_anthropic_response
 def orch_env(mock_session_state_for_orchestrator, mock_anthropic_client):
     """Full orchestrator test environment with patched st + client + persistence."""
     ss = mock_session_state_for_orchestrator
-    with patch("pm_copilot.orchestrator.client", mock_anthropic_client), \
+    with patch("pm_copilot.orchestrator._get_client", return_value=mock_anthropic_client), \
          patch("pm_copilot.orchestrator.save_project"), \
          patch("pm_copilot.orchestrator._load_context_file"), \
          patch("pm_copilot.orchestrator.format_org_context", return_value="Mocked org context"):
@@ -33,9 +33,10 @@ def orch_env(mock_session_state_for_orchestrator, mock_anthropic_client):
             _run_phase_a,
             _run_phase_b,
             _build_phase_b_prompt,
+            _build_phase_b_system,
             _post_turn_updates,
             _build_assumption_summary,
-            _format_messages,
+            _build_phase_b_messages,
             _format_skeleton,
         )
         yield SimpleNamespace(
@@ -45,9 +46,10 @@ def orch_env(mock_session_state_for_orchestrator, mock_anthropic_client):
             _run_phase_a=_run_phase_a,
             _run_phase_b=_run_phase_b,
             _build_phase_b_prompt=_build_phase_b_prompt,
+            _build_phase_b_system=_build_phase_b_system,
             _post_turn_updates=_post_turn_updates,
             _build_assumption_summary=_build_assumption_summary,
-            _format_messages=_format_messages,
+            _build_phase_b_messages=_build_phase_b_messages,
             _format_skeleton=_format_skeleton,
         )
 
@@ -108,6 +110,17 @@ class TestRunTurn:
         assert ss.messages[0]["content"] == "My problem is X"
         assert ss.messages[1]["role"] == "assistant"
 
+    def test_records_user_message_index(self, orch_env):
+        ss = orch_env.ss
+        ss.messages = [{"role": "assistant", "content": "Welcome"}]
+        orch_env.client.messages.create.side_effect = [
+            _make_anthropic_response(json.dumps(_routing_json())),
+            _make_anthropic_response("Response"),
+        ]
+        orch_env.run_turn("[User is responding to Question 1]\n\nAnswer")
+        assert ss.last_user_msg_idx == 1
+        assert ss.messages[ss.last_user_msg_idx]["role"] == "user"
+
     def test_assembles_rag_context_when_requires_retrieval(self, orch_env):
         ss = orch_env.ss
         mock_rag = MagicMock()
@@ -127,6 +140,9 @@ class TestRunTurn:
         ]
         orch_env.run_turn("question")
         mock_rag.assemble_context.assert_called_once()
+        mock_rag.prefetch_conversations.assert_called_once_with("question", ss.turn_count)
+        kwargs = mock_rag.assemble_context.call_args.kwargs
+        assert kwargs["retrieved_conversations"] is mock_rag.prefetch_conversations.return_value
 
     def test_uses_minimal_when_no_retrieval(self, orch_env):
         ss = orch_env.ss
@@ -187,6 +203,65 @@ class TestRunPhaseA:
         result = orch_env._run_phase_a("test")
         assert result["next_action"] == "ask_questions"
 
+    def test_prompt_matches_full_template(self, orch_env):
+        from pm_copilot.prompts import PHASE_A_PROMPT
+        orch_env.client.messages.create.return_value = _make_anthropic_response(
+            json.dumps(_routing_json())
+        )
+        orch_env.ss.messages.append({"role": "user", "content": "test"})
+        orch_env._run_phase_a("test")
+        sent = orch_env.client.messages.create.call_args[1]["messages"][0]["content"]
+        ss = orch_env.ss
+        assert sent == PHASE_A_PROMPT.format(
+            turn_count=ss.turn_count,
+            current_phase=ss.current_phase,
+            active_mode=ss.active_mode,
+            probes_fired=ss.routing_context["probes_fired"],
+            patterns_fired=ss.routing_context["patterns_fired"],
+            micro_synthesis_due=ss.routing_context["micro_synthesis_due"],
+            critical_mass_reached=ss.routing_context["critical_mass_reached"],
+            assumption_summary="No assumptions registered yet.",
+            recent_messages="USER: test",
+            original_input="test",
+            conversation_summary="(No summary yet — first turn)",
+            org_context_domain="",
+        )
+
+    def test_uses_phase_a_model(self, orch_env):
+        from pm_copilot import config
+        orch_env.client.messages.create.return_value = _make_anthropic_response(
+            json.dumps(_routing_json())
+        )
+        orch_env.ss.messages.append({"role": "user", "content": "test"})
+        orch_env._run_phase_a("test")
+        call_kwargs = orch_env.client.messages.create.call_args[1]
+        assert call_kwargs["model"] == config.PHASE_A_MODEL
+
+    def test_escalates_to_main_model_on_conflict_hint(self, orch_env):
+        from pm_copilot.config import MODEL_NAME
+        orch_env.client.messages.create.return_value = _make_anthropic_response(
+            json.dumps(_routing_json())
+        )
+        message = "Actually, that contradicts what I said about pricing"
+        orch_env.ss.messages.append({"role": "user", "content": message})
+        orch_env._run_phase_a(message)
+        call_kwargs = orch_env.client.messages.create.call_args[1]
+        assert call_kwargs["model"] == MODEL_NAME
+
+    @pytest.mark.parametrize("message", [
+        "We actually have three teams",
+        "Use Slack instead of email",
+        "Earlier you asked about pricing",
+    ])
+    def test_everyday_wording_stays_on_phase_a_model(self, orch_env, message):
+        from pm_copilot import config
+        orch_env.client.messages.create.return_value = _make_anthropic_response(
+            json.dumps(_routing_json())
+        )
+        orch_env.ss.messages.append({"role": "user", "content": message})
+        orch_env._run_phase_a(message)
+        assert orch_env.client.messages.create.call_args[1]["model"] == config.PHASE_A_MODEL
+
     def test_enters_mode_1(self, orch_env):
         ss = orch_env.ss
         routing = _routing_json({"enter_mode": "mode_1"})
@@ -275,6 +350,55 @@ class TestRunPhaseB:
         assert "Done registering" in result
         assert orch_env.client.messages.create.call_count == 2
 
+    def test_max_tokens_follows_next_action(self, orch_env):
+        orch_env.client.messages.create.return_value = _make_anthropic_response("Q?")
+        orch_env._run_phase_b(_routing_json({"next_action": "ask_questions"}))
+        assert orch_env.client.messages.create.call_args[1]["max_tokens"] == 2048
+        orch_env._run_phase_b(_routing_json({"next_action": "continue_mode"}))
+        assert orch_env.client.messages.create.call_args[1]["max_tokens"] == 8096
+
+    def test_max_tokens_resets_after_tool_results(self, orch_env):
+        orch_env.client.messages.create.side_effect = [
+            _make_anthropic_response(
+                tool_calls=[("update_problem_statement", {"text": "Problem"}, "tool_1")],
+            ),
+            _make_anthropic_response("Done."),
+        ]
+        with patch("pm_copilot.orchestrator.handle_tool_call", return_value="OK"):
+            orch_env._run_phase_b(_routing_json({"next_action": "ask_questions"}))
+        calls = orch_env.client.messages.create.call_args_list
+        assert calls[0][1]["max_tokens"] == 2048
+        assert calls[1][1]["max_tokens"] == 8096
+
+    def test_max_tokens_stop_retries_at_full_budget(self, orch_env):
+        cut_off = _make_anthropic_response(
+            "Here are my ques",
+            tool_calls=[("register_assumption", {"claim": "Half"}, "tool_1")],
+        )
+        cut_off.stop_reason = "max_tokens"
+        orch_env.client.messages.create.side_effect = [cut_off, _make_anthropic_response("Full reply.")]
+        with patch("pm_copilot.orchestrator.handle_tool_call") as tool:
+            result = orch_env._run_phase_b(_routing_json({"next_action": "ask_questions"}))
+        tool.assert_not_called()
+        assert result == "Full reply."
+        calls = orch_env.client.messages.create.call_args_list
+        assert [c[1]["max_tokens"] for c in calls] == [2048, 8096]
+        assert calls[1][1]["messages"][-1]["role"] == "user"
+
+    def test_caches_tools_and_latest_tool_result(self, orch_env):
+        orch_env.client.messages.create.side_effect = [
+            _make_anthropic_response(tool_calls=[("update_problem_statement", {"text": "P"}, "tool_1")]),
+            _make_anthropic_response(tool_calls=[("update_target_audience", {"text": "A"}, "tool_2")]),
+            _make_anthropic_response("Done."),
+        ]
+        with patch("pm_copilot.orchestrator.handle_tool_call", return_value="OK"):
+            orch_env._run_phase_b(_routing_json())
+        kwargs = orch_env.client.messages.create.call_args[1]
+        assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert all("cache_control" not in t for t in kwargs["tools"][:-1])
+        results = [m["content"][0] for m in kwargs["messages"] if m["role"] == "user"][1:]
+        assert [("cache_control" in r) for r in results] == [False, True]
+
     def test_generate_artifact_bypass(self, orch_env):
         """generate_artifact result appended directly, tool_result says 'rendered'."""
         orch_env.client.messages.create.side_effect = [
@@ -294,6 +418,41 @@ class TestRunPhaseB:
         tool_results = user_msg["content"]
         assert any("rendered" in str(tr.get("content", "")).lower() for tr in tool_results)
 
+    def test_streams_text_deltas_with_on_text(self, orch_env):
+        final = _make_anthropic_response(
+            text="Let me register this.",
+            tool_calls=[("update_problem_statement", {"text": "Problem"}, "tool_1")],
+        )
+        stream = MagicMock()
+        stream.__enter__.return_value.text_stream = iter(["Let me ", "register this."])
+        stream.__enter__.return_value.get_final_message.return_value = final
+        done = MagicMock()
+        done.__enter__.return_value.text_stream = iter(["Done."])
+        done.__enter__.return_value.get_final_message.return_value = _make_anthropic_response("Done.")
+        orch_env.client.messages.stream.side_effect = [stream, done]
+        deltas = []
+        with patch("pm_copilot.orchestrator.handle_tool_call", return_value="OK"):
+            result = orch_env._run_phase_b(_routing_json(), on_text=deltas.append)
+        assert deltas == ["Let me ", "register this.", "Done."]
+        assert result == "".join(deltas)
+        orch_env.client.messages.create.assert_not_called()
+
+    def test_streams_artifact_before_follow_up_call(self, orch_env):
+        artifact = MagicMock()
+        artifact.__enter__.return_value.text_stream = iter([])
+        artifact.__enter__.return_value.get_final_message.return_value = _make_anthropic_response(
+            tool_calls=[("generate_artifact", {"artifact_type": "problem_brief"}, "tool_1")],
+        )
+        done = MagicMock()
+        done.__enter__.return_value.text_stream = iter(["Done."])
+        done.__enter__.return_value.get_final_message.return_value = _make_anthropic_response("Done.")
+        orch_env.client.messages.stream.side_effect = [artifact, done]
+        deltas = []
+        with patch("pm_copilot.orchestrator.handle_tool_call", return_value="# Problem Brief"):
+            result = orch_env._run_phase_b(_routing_json(), on_text=deltas.append)
+        assert deltas == ["\n\n# Problem Brief", "Done."]
+        assert result == "".join(deltas)
+
     def test_api_error_with_partial_text(self, orch_env):
         # First call succeeds with text, second raises
         orch_env.client.messages.create.side_effect = [
@@ -331,6 +490,48 @@ class TestRunPhaseB:
         result = orch_env._run_phase_b(_routing_json())
         assert result == "OK"
 
+    def test_short_prompt_skips_token_count(self, orch_env):
+        orch_env.client.messages.create.return_value = _make_anthropic_response("OK")
+        orch_env._run_phase_b(_routing_json())
+        orch_env.client.messages.count_tokens.assert_not_called()
+
+    def test_truncates_when_token_count_over_budget(self, orch_env):
+        ss = orch_env.ss
+        for i in range(15):
+            ss.messages.append({"role": "user", "content": f"Message {i} " * 2500})
+            ss.messages.append({"role": "assistant", "content": f"Reply {i} " * 2500})
+        orch_env.client.messages.count_tokens.return_value = SimpleNamespace(input_tokens=190_000)
+        orch_env.client.messages.create.return_value = _make_anthropic_response("OK")
+        orch_env._run_phase_b(_routing_json())
+        orch_env.client.messages.count_tokens.assert_called_once()
+        sent = orch_env.client.messages.create.call_args.kwargs["messages"]
+        assert len(sent) == 23  # first message, marker, last 20, prompt
+        assert "earlier conversation truncated" in sent[1]["content"]
+
+    def test_large_org_context_counts_toward_token_check(self, orch_env):
+        ss = orch_env.ss
+        for i in range(15):
+            ss.messages.append({"role": "user", "content": f"Message {i} " * 500})
+            ss.messages.append({"role": "assistant", "content": f"Reply {i} " * 500})
+        orch_env.client.messages.count_tokens.return_value = SimpleNamespace(input_tokens=150_000)
+        orch_env.client.messages.create.return_value = _make_anthropic_response("OK")
+        with patch("pm_copilot.orchestrator.format_org_context", return_value="org " * 100_000):
+            orch_env._run_phase_b(_routing_json())
+        orch_env.client.messages.count_tokens.assert_called_once()
+
+    def test_long_history_truncated_before_building(self, orch_env):
+        ss = orch_env.ss
+        for i in range(15):
+            ss.messages.append({"role": "user", "content": f"Message {i} " * 5000})
+            ss.messages.append({"role": "assistant", "content": f"Reply {i} " * 5000})
+        orch_env.client.messages.create.return_value = _make_anthropic_response("OK")
+        with patch("pm_copilot.orchestrator._build_phase_b_messages",
+                   wraps=orch_env._build_phase_b_messages) as build:
+            orch_env._run_phase_b(_routing_json())
+        build.assert_called_once()
+        orch_env.client.messages.count_tokens.assert_not_called()
+        assert build.call_args.args[0][1]["content"].startswith("[...earlier")
+
 
 # ===================================================================
 # _build_phase_b_prompt
@@ -370,28 +571,120 @@ class TestBuildPhaseBPrompt:
         prompt = orch_env._build_phase_b_prompt(_routing_json(), assembled)
         assert isinstance(prompt, str)
 
+    def test_mode2_with_rag_moves_static_knowledge_to_system(self, orch_env):
+        from pm_copilot.mode2_knowledge import (
+            MODE2_CORE_STATIC,
+            MODE2_RISK_FRAMEWORK,
+            MODE2_RISK_FRAMEWORK_RULES,
+        )
+
+        orch_env.ss.active_mode = "mode_2"
+        assembled = {
+            "context_block": "Context",
+            "probe_content": "Probe body", "pattern_content": "",
+            "retrieved_documents": "", "retrieved_conversations": "",
+        }
+        prompt = orch_env._build_phase_b_prompt(_routing_json(), assembled)
+        system = orch_env._build_phase_b_system()
+        assert "Probe body" in prompt
+        assert MODE2_RISK_FRAMEWORK not in prompt
+        assert system[1]["text"] == MODE2_CORE_STATIC
+        assert system[1]["cache_control"] == {"type": "ephemeral"}
+        assert MODE2_RISK_FRAMEWORK_RULES in system[2]["text"]
+
+    def test_mode2_risk_examples_only_on_layer3_turns(self, orch_env):
+        from pm_copilot.mode2_knowledge import MODE2_RISK_FRAMEWORK_EXAMPLES
+
+        orch_env.ss.active_mode = "mode_2"
+        orch_env.ss.routing_context["mode_turn_count"] = 3
+        assembled = {
+            "context_block": "", "probe_content": "", "pattern_content": "",
+            "retrieved_documents": "", "retrieved_conversations": "",
+        }
+        routine = orch_env._build_phase_b_prompt(_routing_json({"next_probe": "Build vs Buy"}), assembled)
+        risk = orch_env._build_phase_b_prompt(_routing_json({"next_probe": "Feasibility Risk"}), assembled)
+        assert MODE2_RISK_FRAMEWORK_EXAMPLES not in routine
+        assert MODE2_RISK_FRAMEWORK_EXAMPLES in risk
+
+        orch_env.ss.routing_context["mode_turn_count"] = 0
+        first = orch_env._build_phase_b_prompt(_routing_json(), assembled)
+        assert MODE2_RISK_FRAMEWORK_EXAMPLES in first
+        # System blocks stay the same, so the history cache prefix survives
+        assert all(MODE2_RISK_FRAMEWORK_EXAMPLES not in b["text"] for b in orch_env._build_phase_b_system())
+
+    def test_org_context_is_last_cached_system_block(self, orch_env):
+        from pm_copilot.prompts import SYSTEM_PROMPT
+
+        for mode in (None, "mode_1", "mode_2"):
+            orch_env.ss.active_mode = mode
+            orch_env.ss.routing_context["mode_turn_count"] = 3
+            system = orch_env._build_phase_b_system("Acme internal context")
+            assert system[0]["text"] == SYSTEM_PROMPT
+            assert system[-1]["text"].endswith("Acme internal context")
+            assert system[-1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_org_context_not_in_prompt(self, orch_env):
+        orch_env.ss.active_mode = "mode_1"
+        assembled = {
+            "context_block": "Acme internal context", "probe_content": "",
+            "pattern_content": "", "retrieved_documents": "",
+            "retrieved_conversations": "",
+        }
+        prompt = orch_env._build_phase_b_prompt(_routing_json(), assembled)
+        assert "Acme internal context" not in prompt
+        orch_env.client.messages.create.return_value = _make_anthropic_response("OK")
+        orch_env._run_phase_b(_routing_json(), assembled_context=assembled)
+        system = orch_env.client.messages.create.call_args.kwargs["system"]
+        assert system[-1]["text"].endswith("Acme internal context")
+
+    def test_mode2_legacy_injects_only_selected_knowledge(self, orch_env):
+        from pm_copilot.mode2_knowledge import MODE2_PROBES, MODE2_PATTERNS
+
+        orch_env.ss.active_mode = "mode_2"
+        pattern = next(iter(MODE2_PATTERNS))
+        orch_env.ss.routing_context["patterns_fired"] = [{"name": pattern, "reason": "r", "turn": 1}]
+        routing = _routing_json({"next_probe": "Value Risk", "suggested_probes": ["Build vs Buy"]})
+        prompt = orch_env._build_phase_b_prompt(routing, assembled_context=None)
+        assert MODE2_PROBES["Value Risk"] in prompt
+        assert MODE2_PROBES["Build vs Buy"] in prompt
+        assert MODE2_PROBES["Usability Risk"] not in prompt
+        assert MODE2_PATTERNS[pattern] in prompt
+
+    def test_mode1_legacy_injects_only_selected_knowledge(self, orch_env):
+        from pm_copilot.mode1_knowledge import MODE1_CORE_INSTRUCTIONS, MODE1_PROBES
+
+        orch_env.ss.active_mode = "mode_1"
+        routing = _routing_json({"next_probe": "Probe 2"})
+        prompt = orch_env._build_phase_b_prompt(routing, assembled_context=None)
+        system = orch_env._build_phase_b_system()
+        assert MODE1_CORE_INSTRUCTIONS not in prompt
+        assert system[1]["text"] == MODE1_CORE_INSTRUCTIONS
+        assert MODE1_PROBES["Probe 2"] in prompt
+        assert MODE1_PROBES["Probe 1"] not in prompt
+
     def test_legacy_mode_no_rag(self, orch_env):
-        """assembled_context=None → uses full MODE1_KNOWLEDGE."""
+        """assembled_context=None → uses Phase A's probe and pattern picks."""
         orch_env.ss.active_mode = "mode_1"
         with patch("pm_copilot.orchestrator.format_org_context", return_value="Org ctx"):
             prompt = orch_env._build_phase_b_prompt(_routing_json(), assembled_context=None)
         assert isinstance(prompt, str)
         assert len(prompt) > 100
 
-    def test_messages_override(self, orch_env):
-        override = [
-            {"role": "user", "content": "Override message"},
-            {"role": "assistant", "content": "Override reply"},
+    def test_includes_only_latest_user_message(self, orch_env):
+        orch_env.ss.messages = [
+            {"role": "user", "content": "Earlier message"},
+            {"role": "assistant", "content": "Earlier reply"},
+            {"role": "user", "content": "Latest message"},
         ]
         assembled = {
             "context_block": "", "probe_content": "",
             "pattern_content": "", "retrieved_documents": "",
             "retrieved_conversations": "",
         }
-        prompt = orch_env._build_phase_b_prompt(
-            _routing_json(), assembled, messages_override=override
-        )
-        assert "Override message" in prompt
+        prompt = orch_env._build_phase_b_prompt(_routing_json(), assembled)
+        assert "Latest message" in prompt
+        assert "Earlier message" not in prompt
+        assert "Earlier reply" not in prompt
 
 
 # ===================================================================
@@ -433,7 +726,7 @@ class TestPostTurnUpdates:
         assert ss.routing_context["mode_turn_count"] == 0
 
     def test_rag_turn_indexing_beyond_window(self, orch_env):
-        """turn > ALWAYS_ON_TURN_WINDOW → _generate_turn_summary + rag.index_turn called."""
+        """turn > ALWAYS_ON_TURN_WINDOW → _generate_turn_summary + rag.queue_turn called."""
         ss = orch_env.ss
         mock_rag = MagicMock()
         mock_rag.enabled = True
@@ -441,31 +734,32 @@ class TestPostTurnUpdates:
         ss.turn_count = 5  # > ALWAYS_ON_TURN_WINDOW (3)
         with patch("pm_copilot.orchestrator._generate_turn_summary",
                     return_value="Summary of turn"):
-            orch_env._post_turn_updates(_routing_json(), "user msg", "response")
-        mock_rag.index_turn.assert_called_once()
+            orch_env._post_turn_updates(_routing_json(), "user msg", "response").result()
+        mock_rag.queue_turn.assert_called_once()
+        assert mock_rag.queue_turn.call_args.kwargs["turn_summary"] == "Summary of turn"
 
     def test_rag_skips_indexing_within_window(self, orch_env):
-        """turn ≤ ALWAYS_ON_TURN_WINDOW → rag.index_turn NOT called."""
+        """turn ≤ ALWAYS_ON_TURN_WINDOW → rag.queue_turn NOT called."""
         ss = orch_env.ss
         mock_rag = MagicMock()
         mock_rag.enabled = True
         ss.rag = mock_rag
         ss.turn_count = 2  # ≤ 3
-        orch_env._post_turn_updates(_routing_json(), "user msg", "response")
-        mock_rag.index_turn.assert_not_called()
+        assert orch_env._post_turn_updates(_routing_json(), "user msg", "response") is None
+        mock_rag.queue_turn.assert_not_called()
 
     def test_rag_handles_indexing_failure(self, orch_env):
-        """rag.index_turn raises → warning logged, no crash."""
+        """rag.queue_turn raises → warning logged, no crash."""
         ss = orch_env.ss
         mock_rag = MagicMock()
         mock_rag.enabled = True
-        mock_rag.index_turn.side_effect = RuntimeError("Embedding failed")
+        mock_rag.queue_turn.side_effect = RuntimeError("Embedding failed")
         ss.rag = mock_rag
         ss.turn_count = 5
         with patch("pm_copilot.orchestrator._generate_turn_summary",
                     return_value="Summary"):
             # Should not raise
-            orch_env._post_turn_updates(_routing_json(), "msg", "resp")
+            orch_env._post_turn_updates(_routing_json(), "msg", "resp").result()
 
     def test_called_from_run_turn(self, orch_env):
         """Verify _post_turn_updates is called with correct args from run_turn."""
@@ -514,17 +808,68 @@ class TestBuildAssumptionSummary:
         result = orch_env._build_assumption_summary()
         assert "🔴" not in result
 
+    def test_rerenders_assumption_changed_by_tool(self, orch_env, mock_session_state_for_tools):
+        from pm_copilot.tools import handle_tool_call
+        handle_tool_call("register_assumption", {
+            "claim": "Users want X", "type": "value", "impact": "high",
+            "confidence": "guessed", "basis": "Hunch", "surfaced_by": "probe_1",
+        })
+        assert "🔴" in orch_env._build_assumption_summary()
+        handle_tool_call("update_assumption_confidence", {
+            "assumption_id": "A1", "new_confidence": "validated", "reason": "Survey",
+        })
+        result = orch_env._build_assumption_summary()
+        assert "🔴" not in result
+        assert "validated" in result
+        assert not orch_env.ss.assumption_register_dirty
+
+
+class TestBuildPhaseBMessages:
+    def test_prior_turns_sent_as_messages(self, orch_env):
+        history = [
+            {"role": "user", "content": "First"},
+            {"role": "assistant", "content": "Reply"},
+            {"role": "user", "content": "Latest"},
+        ]
+        api_messages = orch_env._build_phase_b_messages(history, "PROMPT")
+        assert [m["role"] for m in api_messages] == ["user", "assistant", "user"]
+        assert api_messages[0]["content"] == "First"
+        assert api_messages[-1]["content"] == "PROMPT"
+
+    def test_breakpoint_on_newest_prior_turn(self, orch_env):
+        history = [
+            {"role": "user", "content": "First"},
+            {"role": "assistant", "content": "Reply"},
+            {"role": "user", "content": "Latest"},
+        ]
+        api_messages = orch_env._build_phase_b_messages(history, "PROMPT")
+        assert api_messages[1]["content"] == [
+            {"type": "text", "text": "Reply", "cache_control": {"type": "ephemeral"}}
+        ]
+        # Session messages are not modified
+        assert history[1]["content"] == "Reply"
 
-class TestFormatMessages:
     def test_wraps_large_user_input(self, orch_env):
-        messages = [{"role": "user", "content": "x" * 600}]
-        result = orch_env._format_messages(messages)
-        assert "<user_context>" in result
+        history = [
+            {"role": "user", "content": "x" * 600},
+            {"role": "assistant", "content": "Reply"},
+            {"role": "user", "content": "Hello"},
+        ]
+        api_messages = orch_env._build_phase_b_messages(history, "PROMPT")
+        assert "<user_context>" in api_messages[0]["content"]
 
-    def test_does_not_wrap_short_input(self, orch_env):
-        messages = [{"role": "user", "content": "Hello"}]
-        result = orch_env._format_messages(messages)
-        assert "<user_context>" not in result
+    def test_assistant_first_history_gets_user_opener(self, orch_env):
+        history = [
+            {"role": "assistant", "content": "Priming question"},
+            {"role": "user", "content": "Answer"},
+        ]
+        api_messages = orch_env._build_phase_b_messages(history, "PROMPT")
+        assert [m["role"] for m in api_messages] == ["user", "assistant", "user"]
+
+    def test_empty_history_is_prompt_only(self, orch_env):
+        assert orch_env._build_phase_b_messages([], "PROMPT") == [
+            {"role": "user", "content": "PROMPT"}
+        ]
 
 
 class TestFormatSkeleton:
@@ -554,3 +899,12 @@ class TestFormatSkeleton:
         assert "Widget Pro" in result
         assert "high" in result
         assert "conditional_go" in result
+
+    def test_memoized_until_skeleton_tool_runs(self, orch_env, mock_session_state_for_tools):
+        from pm_copilot.tools import handle_tool_call
+        first = orch_env._format_skeleton()
+        with patch("pm_copilot.orchestrator._render_skeleton") as render:
+            assert orch_env._format_skeleton() is first
+        render.assert_not_called()
+        handle_tool_call("update_problem_statement", {"text": "Problem Y"})
+        assert "Problem Y" in orch_env._format_skeleton()
@@ -0,0 +1,277 @@
+"""Unit tests for pm_copilot.persistence — state.json, messages.jsonl, context.md."""
+
+import os
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from pm_copilot.persistence import (
+    MESSAGES_LOG,
+    PERSISTED_KEYS,
+    _atomic_write,
+    _load_context_file,
+    _write_context_file,
+    load_project,
+    load_project_state,
+    save_project,
+    save_project_state,
+)
+from pm_copilot.state import init_session_state
+from pm_copilot.tools import handle_tool_call
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    path = tmp_path / "acme"
+    path.mkdir()
+    return path
+
+
+def _msg(role, content):
+    return {"role": role, "content": content}
+
+
+def _log_lines(project_dir):
+    return [orjson.loads(line) for line in (project_dir / MESSAGES_LOG).read_bytes().splitlines()]
+
+
+def _reload(ss, project_dir):
+    """Drop the session like a project switch does, then load from disk."""
+    ss.clear()
+    load_project(project_dir)
+
+
+# ===================================================================
+# state.json round trip
+# ===================================================================
+
+
+class TestStateRoundTrip:
+    def test_populated_state_survives_save_and_load(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.clear()
+        init_session_state()
+        ss.project_name = "Acme"
+        ss.active_mode = "mode_2"
+        ss.messages = [{"role": "user", "content": "Churn is up"}, {"role": "assistant", "content": "Why?"}]
+        handle_tool_call("register_assumption", {
+            "claim": "Churn is driven by onboarding", "type": "value", "impact": "high",
+            "confidence": "guessed", "basis": "User said so", "surfaced_by": "Probe 1",
+        })
+        handle_tool_call("update_problem_statement", {"text": "Onboarding loses users"})
+        handle_tool_call("add_stakeholder", {"name": "VP Sales", "type": "decision_authority"})
+        handle_tool_call("add_decision_criteria", {"criteria_type": "proceed_if", "condition": "Churn > 5%"})
+        handle_tool_call("set_risk_assessment", {"dimension": "value", "level": "high", "summary": "Unproven"})
+        handle_tool_call("record_probe_fired", {"probe_name": "Probe 1"})
+        handle_tool_call("record_pattern_fired", {"pattern_name": "Solution Smuggling", "trigger_reason": "r"})
+        handle_tool_call("update_conversation_summary", {"summary": "Churn discussion"})
+        assert ss.assumption_register and ss.document_skeleton["stakeholders"]
+        assert ss.routing_context["probes_fired"] and ss.routing_context["patterns_fired"]
+        expected = orjson.loads(orjson.dumps({k: ss[k] for k in PERSISTED_KEYS}))
+
+        save_project(project_dir)
+        _reload(ss, project_dir)
+
+        assert {k: ss[k] for k in PERSISTED_KEYS} == expected
+        assert ss.project_name == "Acme"
+
+    def test_non_str_keys_do_not_abort_save(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.routing_context["by_turn"] = {1: "first"}
+        save_project(project_dir)
+        saved = orjson.loads((project_dir / "state.json").read_bytes())
+        assert saved["routing_context"]["by_turn"] == {"1": "first"}
+
+    def test_project_state_round_trip(self, project_dir):
+        state = {"file_summaries": [{"filename": "a.md", "summary": "A"}], "org_context": "", 7: "x"}
+        save_project_state(project_dir, state)
+        assert load_project_state(project_dir)["file_summaries"] == state["file_summaries"]
+        assert not (project_dir / "project_state.json.tmp").exists()
+
+
+# ===================================================================
+# messages.jsonl
+# ===================================================================
+
+
+class TestMessagesLog:
+    def test_first_save_writes_whole_log(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        save_project(project_dir)
+        assert _log_lines(project_dir) == ss.messages
+        assert ss.messages_log["offsets"][-1] == (project_dir / MESSAGES_LOG).stat().st_size
+        saved = orjson.loads((project_dir / "state.json").read_bytes())
+        assert "messages" not in saved
+        assert saved["messages_logged"] == 2
+
+    def test_state_json_stays_indented(self, mock_session_state_for_persistence, project_dir):
+        save_project(project_dir)
+        text = (project_dir / "state.json").read_text()
+        assert text.startswith('{\n  "schema_version"')
+        assert '\n  "turn_count": 0' in text
+
+    def test_new_messages_are_appended(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        save_project(project_dir)
+        before = (project_dir / MESSAGES_LOG).read_bytes()
+        ss.messages.append(_msg("user", "Next"))
+        with patch("pm_copilot.persistence._atomic_write", wraps=_atomic_write) as write:
+            save_project(project_dir)
+        assert all(c.args[0].name != MESSAGES_LOG for c in write.call_args_list)
+        after = (project_dir / MESSAGES_LOG).read_bytes()
+        assert after.startswith(before)
+        assert orjson.loads(after[len(before):]) == _msg("user", "Next")
+
+    def test_edited_latest_user_message_truncates_at_its_offset(
+        self, mock_session_state_for_persistence, project_dir
+    ):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello"), _msg("user", "[Q1] yes")]
+        save_project(project_dir)
+        offset = ss.messages_log["offsets"][2]
+        head = (project_dir / MESSAGES_LOG).read_bytes()[:offset]
+        # The app swaps in the clean user text after the turn, then the next turn adds more
+        ss.messages[2]["content"] = "yes"
+        ss.messages.append(_msg("assistant", "Noted"))
+        with patch("pm_copilot.persistence._atomic_write", wraps=_atomic_write) as write:
+            save_project(project_dir)
+        assert all(c.args[0].name != MESSAGES_LOG for c in write.call_args_list)
+        assert (project_dir / MESSAGES_LOG).read_bytes()[:offset] == head
+        assert _log_lines(project_dir) == ss.messages
+        assert ss.messages_log["offsets"][-1] == (project_dir / MESSAGES_LOG).stat().st_size
+
+    def test_new_project_dir_rewrites_log(self, mock_session_state_for_persistence, tmp_path, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        save_project(project_dir)
+        other = tmp_path / "copy"
+        other.mkdir()
+        ss.messages.append(_msg("user", "Next"))
+        save_project(other)
+        assert _log_lines(other) == ss.messages
+        assert ss.messages_log["dir"] == str(other)
+
+    def test_torn_final_line_is_dropped(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        save_project(project_dir)
+        with open(project_dir / MESSAGES_LOG, "ab") as f:
+            f.write(b'{"role": "user", "cont')
+        _reload(ss, project_dir)
+        assert ss.messages == [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        assert ss.messages_log is None
+        save_project(project_dir)
+        assert _log_lines(project_dir) == ss.messages
+
+    def test_log_ahead_of_state_is_cut_on_load(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.messages = [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        save_project(project_dir)
+        # A crash after the log append but before state.json was replaced
+        with open(project_dir / MESSAGES_LOG, "ab") as f:
+            f.write(orjson.dumps(_msg("user", "Lost")) + b"\n")
+        _reload(ss, project_dir)
+        assert ss.messages == [_msg("user", "Hi"), _msg("assistant", "Hello")]
+        assert ss.messages_log is None
+        ss.messages.append(_msg("user", "Again"))
+        save_project(project_dir)
+        assert _log_lines(project_dir) == ss.messages
+
+    def test_legacy_inline_messages_migrate_to_log(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        legacy = {
+            "schema_version": "1.0", "project_name": "Old", "turn_count": 1,
+            "messages": [_msg("user", "Hi"), _msg("assistant", "Hello")],
+        }
+        (project_dir / "state.json").write_bytes(orjson.dumps(legacy))
+        _reload(ss, project_dir)
+        assert ss.messages == legacy["messages"]
+        save_project(project_dir)
+        assert _log_lines(project_dir) == legacy["messages"]
+        saved = orjson.loads((project_dir / "state.json").read_bytes())
+        assert "messages" not in saved
+        assert saved["messages_logged"] == 2
+
+
+# ===================================================================
+# Skipped writes and reads
+# ===================================================================
+
+
+def _age(path):
+    """Push path's mtime into the past so a rewrite is visible."""
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return path.stat().st_mtime_ns
+
+
+class TestSaveSkip:
+    def test_identical_save_leaves_state_json_alone(self, mock_session_state_for_persistence, project_dir):
+        save_project(project_dir)
+        mtime = _age(project_dir / "state.json")
+        save_project(project_dir)
+        assert (project_dir / "state.json").stat().st_mtime_ns == mtime
+
+    def test_new_message_forces_write(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        save_project(project_dir)
+        mtime = _age(project_dir / "state.json")
+        ss.messages.append(_msg("user", "Hi"))
+        save_project(project_dir)
+        assert (project_dir / "state.json").stat().st_mtime_ns != mtime
+        assert orjson.loads((project_dir / "state.json").read_bytes())["messages_logged"] == 1
+
+    def test_other_project_dir_forces_write(self, mock_session_state_for_persistence, tmp_path, project_dir):
+        save_project(project_dir)
+        other = tmp_path / "copy"
+        other.mkdir()
+        save_project(other)
+        assert (other / "state.json").exists()
+
+    def test_changed_state_forces_write(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        save_project(project_dir)
+        mtime = _age(project_dir / "state.json")
+        ss.turn_count = 1
+        save_project(project_dir)
+        assert (project_dir / "state.json").stat().st_mtime_ns != mtime
+
+
+class TestContextFile:
+    def test_unchanged_file_is_not_reread(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        (project_dir / "context.md").write_text("Acme sells widgets")
+        _load_context_file(project_dir)
+        ss.org_context["internal_context"] = "edited in app"
+        _load_context_file(project_dir)
+        assert ss.org_context["internal_context"] == "edited in app"
+
+    def test_manual_edit_is_reread(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        context_file = project_dir / "context.md"
+        context_file.write_text("Acme sells widgets")
+        _age(context_file)
+        _load_context_file(project_dir)
+        context_file.write_text("Acme sells widgets and gadgets")
+        _load_context_file(project_dir)
+        assert ss.org_context["internal_context"] == "Acme sells widgets and gadgets"
+
+    def test_unchanged_content_is_not_rewritten(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.org_context["company"] = "Acme"
+        _write_context_file(project_dir)
+        mtime = (project_dir / "context.md").stat().st_mtime_ns
+        with patch("pathlib.Path.write_text") as write:
+            _write_context_file(project_dir)
+        write.assert_not_called()
+        assert (project_dir / "context.md").stat().st_mtime_ns == mtime
+
+    def test_manual_edit_is_overwritten(self, mock_session_state_for_persistence, project_dir):
+        ss = mock_session_state_for_persistence
+        ss.org_context["company"] = "Acme"
+        _write_context_file(project_dir)
+        (project_dir / "context.md").write_text("hand edit")
+        _write_context_file(project_dir)
+        assert (project_dir / "context.md").read_text() == "# Acme\n"
@@ -105,6 +105,57 @@ class TestIngestFile:
         assert ids == ["doc.md_chunk_0", "doc.md_chunk_1", "doc.md_chunk_2"]
 
 
+# ===================================================================
+# ingest_files_bulk
+# ===================================================================
+
+
+def _fake_chunks(n):
+    return [
+        {
+            "text": f"chunk {i}", "context_header": "[Source: doc.md]",
+            "header_path": ["H1"], "parent_text": "parent",
+            "parent_id": "pid", "leaf_index": i,
+        }
+        for i in range(n)
+    ]
+
+
+class TestIngestFilesBulk:
+    @patch("pm_copilot.rag.process_files")
+    def test_single_embed_and_add_for_small_batch(self, mock_pf, mock_forge_rag, mock_voyage_client):
+        mock_pf.return_value = {"a.md": _fake_chunks(3), "b.md": _fake_chunks(2)}
+        counts = mock_forge_rag.ingest_files_bulk([
+            (Path("/fake/a.md"), "A"),
+            (Path("/fake/b.md"), "B"),
+        ])
+        assert counts == {"a.md": 3, "b.md": 2}
+        assert mock_voyage_client.embed.call_count == 1
+        mock_forge_rag.documents.add.assert_called_once()
+        ids = mock_forge_rag.documents.add.call_args.kwargs["ids"]
+        assert ids == [
+            "a.md_chunk_0", "a.md_chunk_1", "a.md_chunk_2",
+            "b.md_chunk_0", "b.md_chunk_1",
+        ]
+
+    @patch("pm_copilot.rag.process_files")
+    def test_adds_split_into_sub_batches(self, mock_pf, mock_forge_rag):
+        mock_pf.return_value = {"a.md": _fake_chunks(200), "b.md": _fake_chunks(200)}
+        mock_forge_rag.ingest_files_bulk([
+            (Path("/fake/a.md"), "A"),
+            (Path("/fake/b.md"), "B"),
+        ])
+        sizes = [len(c.kwargs["ids"]) for c in mock_forge_rag.documents.add.call_args_list]
+        assert sizes == [250, 150]
+
+    @patch("pm_copilot.rag.process_files")
+    def test_empty_files_skip_add(self, mock_pf, mock_forge_rag):
+        mock_pf.return_value = {"empty.md": []}
+        counts = mock_forge_rag.ingest_files_bulk([(Path("/fake/empty.md"), "Empty")])
+        assert counts == {"empty.md": 0}
+        mock_forge_rag.documents.add.assert_not_called()
+
+
 # ===================================================================
 # remove_file
 # ===================================================================
@@ -149,6 +200,33 @@ class TestIndexTurn:
         assert call_kwargs["metadatas"][0]["turn_number"] == 5
         assert call_kwargs["metadatas"][0]["active_probe"] == "Probe 1"
 
+    def test_queued_turns_flush_in_one_batch(self, mock_forge_rag):
+        from pm_copilot import config
+
+        turns = range(4, 4 + config.ALWAYS_ON_TURN_WINDOW)
+        for turn in turns:
+            mock_forge_rag.conversations.upsert.assert_not_called()
+            mock_forge_rag.queue_turn(
+                turn_number=turn, user_message="u", assistant_response="a",
+                turn_summary=f"Summary {turn}", active_probe="", active_mode="mode_1",
+            )
+        mock_forge_rag.voyage.embed.assert_called_once()
+        call_kwargs = mock_forge_rag.conversations.upsert.call_args.kwargs
+        assert call_kwargs["ids"] == [f"turn_{t}" for t in turns]
+        assert len(call_kwargs["embeddings"]) == len(turns)
+
+    def test_new_instance_flushes_queue_for_same_project(
+        self, mock_forge_rag, mock_chroma_client, mock_voyage_client, tmp_path
+    ):
+        mock_forge_rag.queue_turn(
+            turn_number=4, user_message="u", assistant_response="a",
+            turn_summary="Summary 4", active_probe="", active_mode="mode_1",
+        )
+        ForgeRAG(tmp_path / "other", mock_chroma_client[0], mock_voyage_client)
+        mock_forge_rag.conversations.upsert.assert_not_called()
+        ForgeRAG(tmp_path, mock_chroma_client[0], mock_voyage_client)
+        assert mock_forge_rag.conversations.upsert.call_args.kwargs["ids"] == ["turn_4"]
+
 
 # ===================================================================
 # retrieve_documents
@@ -340,6 +418,34 @@ class TestLookupProbeAndPatterns:
         # Invalid pattern should trigger a warning
         assert any("Pattern lookup miss" in r.message for r in caplog.records)
 
+    def test_probe_name_variants_resolve(self, mock_forge_rag):
+        from pm_copilot.mode2_knowledge import MODE2_PROBES
+
+        for name in ["value risk", "VALUE-RISK", "Build vs. Buy vs. Partner"]:
+            probe, _ = mock_forge_rag._lookup_probe_and_patterns({"next_probe": name})
+            expected = "Value Risk" if "value" in name.lower() else "Build vs Buy"
+            assert probe == MODE2_PROBES[expected]
+
+    def test_pattern_heading_title_resolves(self, mock_forge_rag):
+        from pm_copilot.mode1_knowledge import MODE1_PATTERNS
+
+        _, patterns = mock_forge_rag._lookup_probe_and_patterns(
+            {"triggered_patterns": ["The Dual-Customer Ambiguity"]}
+        )
+        assert patterns == MODE1_PATTERNS["Dual-Customer Ambiguity"]
+
+    def test_triggered_patterns_in_canonical_order(self, mock_forge_rag):
+        """Pattern section doesn't depend on Phase A's ordering or repeats."""
+        names = ["Build It and They Will Come", "Analytics-Execution Gap"]
+        _, forward = mock_forge_rag._lookup_probe_and_patterns(
+            {"triggered_patterns": names}
+        )
+        _, backward = mock_forge_rag._lookup_probe_and_patterns(
+            {"triggered_patterns": names[::-1] + names}
+        )
+        assert forward == backward
+        assert forward.index("Analytics-Execution Gap") < forward.index("Build It and They Will Come")
+
     def test_no_triggered_patterns(self, mock_forge_rag):
         decision = {"next_probe": "", "triggered_patterns": []}
         _, patterns = mock_forge_rag._lookup_probe_and_patterns(decision)
@@ -459,6 +565,37 @@ class TestAssembleContext:
         assert "Probe 1" in query_text
 
 
+    def test_prefetched_conversations_skip_retrieval(self, mock_forge_rag):
+        mock_forge_rag.documents.count.return_value = 0
+        ctx = mock_forge_rag.assemble_context(
+            user_message="test",
+            phase_a_decision={"next_probe": "", "triggered_patterns": []},
+            current_turn=10,
+            project_state={"file_summaries": [], "org_context": ""},
+            retrieved_conversations="Earlier turn",
+        )
+        assert ctx["retrieved_conversations"] == "Earlier turn"
+        mock_forge_rag.conversations.query.assert_not_called()
+
+
+# ===================================================================
+# warm_up
+# ===================================================================
+
+
+class TestWarmUp:
+    def test_queries_non_empty_collections_with_stored_embedding(self, mock_forge_rag):
+        docs = mock_forge_rag._test_doc_collection
+        docs.get.return_value = {"ids": ["d1"], "embeddings": [[0.1, 0.2]]}
+        mock_forge_rag.warm_up()
+        docs.query.assert_called_once_with(query_embeddings=[[0.1, 0.2]], n_results=1)
+        mock_forge_rag._test_conv_collection.query.assert_not_called()
+
+    def test_never_raises(self, mock_forge_rag):
+        mock_forge_rag._test_doc_collection.get.side_effect = RuntimeError("locked")
+        mock_forge_rag.warm_up()
+
+
 # ===================================================================
 # assemble_context_minimal
 # ===================================================================
@@ -300,6 +300,7 @@ class TestGenerateArtifact:
         assert "# Problem Brief" in result
         assert "Users can't X" in result
         assert ss.latest_artifact == result
+        assert ss.latest_artifact_kind == "problem_brief"
 
     def test_problem_brief_empty_warning(self, mock_session_state_for_tools):
         result = handle_tool_call("generate_artifact", {
@@ -339,6 +340,7 @@ class TestGenerateArtifact:
         })
         assert "Widget Pro" in result
         assert "GO" in result
+        assert mock_session_state_for_tools.latest_artifact_kind == "solution_evaluation_brief"
 
     def test_unknown_artifact_type(self, mock_session_state_for_tools):
         result = handle_tool_call("generate_artifact", {
@@ -404,6 +406,18 @@ class TestMode2Tools:
         assert ss.document_skeleton["solution_name"] == "Acme Widget"
         assert ss.document_skeleton["build_vs_buy_assessment"] == "Build — unique domain"
 
+    def test_set_risk_assessment_rejects_unknown_dimension(self, mock_session_state_for_tools):
+        ss = mock_session_state_for_tools
+        result = handle_tool_call("set_risk_assessment", {
+            "dimension": "ethics", "level": "high", "summary": "x",
+        })
+        assert result.startswith("Invalid input for set_risk_assessment")
+        assert "ethics_risk_level" not in ss.document_skeleton
+
+    def test_set_go_no_go_rejects_missing_fields(self, mock_session_state_for_tools):
+        result = handle_tool_call("set_go_no_go", {"recommendation": "go"})
+        assert "missing required field(s): conditions, dealbreakers" in result
+
     def test_set_solution_info_no_build_vs_buy(self, mock_session_state_for_tools):
         ss = mock_session_state_for_tools
         handle_tool_call("set_solution_info", {
@@ -440,6 +454,18 @@ class TestRoutingTools:
         assert len(ss.routing_context["patterns_fired"]) == 1
         assert ss.routing_context["patterns_fired"][0]["turn"] == 3
 
+    def test_refiring_probe_replaces_entry(self, mock_session_state_for_tools):
+        ss = mock_session_state_for_tools
+        for turn in (2, 6):
+            ss.turn_count = turn
+            handle_tool_call("record_probe_fired", {
+                "probe_name": "Probe 1: Solution-Problem Separation",
+                "summary": f"turn {turn}",
+            })
+        assert len(ss.routing_context["probes_fired"]) == 1
+        assert ss.routing_context["probes_fired"][0]["turn"] == 6
+        assert ss.routing_context["probes_fired"][0]["count"] == 2
+
     def test_update_conversation_summary(self, mock_session_state_for_tools):
         ss = mock_session_state_for_tools
         handle_tool_call("update_conversation_summary", {